@@ -1,4 +1,6 @@
+import concurrent.futures
 import imp
+import json
 import os
 from typing import DefaultDict, Text
 import bpy
@@ -9,7 +11,9 @@ import bpy_extras.io_utils
 import bmesh
 import mathutils
 import math
+import numpy
 import pathlib
+import struct
 
 from . import htaparser
 
@@ -119,11 +123,251 @@ MATRIX_SWITCH = mathutils.Matrix([
 
 TEXTURE_TYPES = ('Diffuse', 'Bump', 'Lightmap', 'Cube', 'Detail')
 
+WELD_PRECISION = {
+    'location': 1e-5,
+    'normal':   1e-3,
+    'tangent':  1e-3,
+    'uv0':      1e-5,
+    'uv1':      1e-5,
+    'uv2':      1e-5,
+}
+
 
 def matrix_flatten(matrix: mathutils.Matrix) -> list:
     return list(sum(map(list, matrix), []))
 
 
+def mesh_columns(item: htaparser.Mesh) -> dict:
+    if item.columnar:
+        return {name: numpy.asarray(item.column(name)) for name in item.vertex_buffer.dtype.names}
+
+    columns = dict()
+
+    for name in ('location', 'normal', 'color', 'uv0', 'uv1', 'uv2'):
+        values = [getattr(vert, name) for vert in item.vertices]
+
+        if values and values[0]:
+            columns[name] = numpy.array(values, dtype=numpy.float32)
+
+    return columns
+
+
+def transform_vertices(matrix: numpy.ndarray, points: numpy.ndarray, w: float = 1.0) -> numpy.ndarray:
+    points = numpy.asarray(points, dtype=numpy.float64)
+
+    homogeneous = numpy.full((len(points), 4), w, dtype=numpy.float64)
+    homogeneous[:, :points.shape[1]] = points
+
+    result = homogeneous @ numpy.asarray(matrix, dtype=numpy.float64).T
+
+    return result[:, [0, 2, 1]]
+
+
+def build_mesh(mesh: bpy.types.Mesh, vertices: numpy.ndarray, indices: numpy.ndarray) -> numpy.ndarray:
+    loops = numpy.ascontiguousarray(indices[:, ::-1], dtype=numpy.int32).ravel()
+    count = len(indices)
+
+    mesh.vertices.add(len(vertices))
+    mesh.vertices.foreach_set('co', numpy.ascontiguousarray(vertices, dtype=numpy.float32).ravel())
+
+    mesh.loops.add(len(loops))
+    mesh.loops.foreach_set('vertex_index', loops)
+
+    mesh.polygons.add(count)
+    mesh.polygons.foreach_set('loop_start', numpy.arange(0, len(loops), 3, dtype=numpy.int32))
+    mesh.polygons.foreach_set('loop_total', numpy.full(count, 3, dtype=numpy.int32))
+    mesh.polygons.foreach_set('use_smooth', numpy.ones(count, dtype=bool))
+
+    mesh.update(calc_edges=True)
+
+    return loops
+
+
+def loop_columns(data: bpy.types.Mesh, names: tuple) -> dict:
+    count = len(data.loops)
+
+    vertex_index = numpy.empty(count, dtype=numpy.int32)
+    data.loops.foreach_get('vertex_index', vertex_index)
+
+    co = numpy.empty(len(data.vertices) * 3, dtype=numpy.float32)
+    data.vertices.foreach_get('co', co)
+
+    columns = dict()
+    columns['location'] = co.reshape(-1, 3)[vertex_index][:, [0, 2, 1]]
+
+    if 'normal' in names:
+        normal = numpy.empty(count * 3, dtype=numpy.float32)
+        data.loops.foreach_get('normal', normal)
+        columns['normal'] = normal.reshape(-1, 3)[:, [0, 2, 1]]
+
+    if 'tangent' in names:
+        tangent = numpy.empty(count * 3, dtype=numpy.float32)
+        data.loops.foreach_get('tangent', tangent)
+
+        sign = numpy.empty(count, dtype=numpy.float32)
+        data.loops.foreach_get('bitangent_sign', sign)
+
+        columns['tangent'] = numpy.column_stack([tangent.reshape(-1, 3)[:, [0, 2, 1]], sign])
+
+    for num, layer in enumerate(data.uv_layers[:3]):
+        name = f'uv{num}'
+        if name not in names:
+            continue
+
+        uv = numpy.empty(count * 2, dtype=numpy.float32)
+        layer.data.foreach_get('uv', uv)
+
+        uv = uv.reshape(-1, 2)
+        uv[:, 1] = 1 - uv[:, 1]
+        columns[name] = uv
+
+    if 'color' in names and 'color' in data.vertex_colors:
+        color = numpy.empty(count * 4, dtype=numpy.float32)
+        data.vertex_colors['color'].data.foreach_get('color', color)
+        columns['color'] = (color.reshape(-1, 4) * 255).astype(numpy.uint8)
+
+    return columns
+
+
+def weld_loops(columns: dict) -> tuple:
+    count = len(columns['location'])
+    keys = list()
+
+    for name in sorted(columns):
+        value = columns[name].reshape(count, -1)
+
+        if name in WELD_PRECISION:
+            value = numpy.round(value / WELD_PRECISION[name])
+
+        keys.append(value.astype(numpy.int64))
+
+    rows = numpy.ascontiguousarray(numpy.hstack(keys))
+    packed = rows.view(numpy.dtype((numpy.void, rows.dtype.itemsize * rows.shape[1]))).ravel()
+
+    _, first, inverse = numpy.unique(packed, return_index=True, return_inverse=True)
+
+    order = numpy.argsort(first)
+    rank = numpy.empty_like(order)
+    rank[order] = numpy.arange(len(order))
+
+    return first[order], rank[inverse.ravel()]
+
+
+def bezier(p0, p1, p2, p3, t):
+    s = 1 - t
+    return s * s * s * p0 + 3 * s * s * t * p1 + 3 * s * t * t * p2 + t * t * t * p3
+
+
+def sample_fcurve(curve: bpy.types.FCurve, frames: numpy.ndarray) -> numpy.ndarray:
+    count = len(curve.keyframe_points)
+
+    if not count:
+        return numpy.zeros(len(frames))
+
+    interpolation = numpy.empty(count, dtype=numpy.int32)
+    curve.keyframe_points.foreach_get('interpolation', interpolation)
+
+    if curve.modifiers or curve.extrapolation != 'CONSTANT' or interpolation[:-1].max(initial=0) > 2:
+        return numpy.array([curve.evaluate(frame) for frame in frames])
+
+    points = dict()
+    for name in ('co', 'handle_left', 'handle_right'):
+        values = numpy.empty(count * 2, dtype=numpy.float64)
+        curve.keyframe_points.foreach_get(name, values)
+        points[name] = values.reshape(-1, 2)
+
+    co = points['co']
+    if count == 1:
+        return numpy.full(len(frames), co[0, 1])
+
+    segment = numpy.clip(numpy.searchsorted(co[:, 0], frames, side='right') - 1, 0, count - 2)
+
+    p0 = co[segment]
+    p3 = co[segment + 1]
+    h1 = p0 - points['handle_right'][segment]
+    h2 = p3 - points['handle_left'][segment + 1]
+
+    width = p3[:, 0] - p0[:, 0]
+    length = numpy.abs(h1[:, 0]) + numpy.abs(h2[:, 0])
+    factor = numpy.where(length > width, width / numpy.where(length > 0, length, 1), 1)[:, None]
+
+    p1 = p0 - h1 * factor
+    p2 = p3 - h2 * factor
+
+    low = numpy.zeros(len(frames))
+    high = numpy.ones(len(frames))
+
+    for _ in range(32):
+        middle = (low + high) / 2
+        before = bezier(p0[:, 0], p1[:, 0], p2[:, 0], p3[:, 0], middle) < frames
+        low = numpy.where(before, middle, low)
+        high = numpy.where(before, high, middle)
+
+    t = numpy.clip((frames - p0[:, 0]) / numpy.where(width > 0, width, 1), 0, 1)
+
+    mode = interpolation[segment]
+    values = numpy.where(mode == 0, p0[:, 1], p0[:, 1] + (p3[:, 1] - p0[:, 1]) * t)
+    values = numpy.where(mode == 2, bezier(p0[:, 1], p1[:, 1], p2[:, 1], p3[:, 1], (low + high) / 2), values)
+
+    values[frames <= co[0, 0]] = co[0, 1]
+    values[frames >= co[-1, 0]] = co[-1, 1]
+
+    return values
+
+
+def euler_to_quaternion(euler: numpy.ndarray) -> numpy.ndarray:
+    ci, cj, ch = numpy.cos(euler.T / 2)
+    si, sj, sh = numpy.sin(euler.T / 2)
+
+    return numpy.stack([
+        cj * ci * ch + sj * si * sh,
+        cj * si * ch - sj * ci * sh,
+        cj * si * sh + sj * ci * ch,
+        cj * ci * sh - sj * si * ch,
+    ], axis=-1)
+
+
+def sample_action(action: bpy.types.Action, count: int) -> tuple:
+    frames = numpy.arange(count, dtype=numpy.float64)
+
+    channels = {
+        'location': numpy.zeros((count, 3)),
+        'rotation_quaternion': numpy.tile([1.0, 0.0, 0.0, 0.0], (count, 1)),
+        'rotation_euler': numpy.zeros((count, 3)),
+        'scale': numpy.ones((count, 3)),
+    }
+    used = set()
+
+    for curve in action.fcurves:
+        if curve.data_path not in ANIM_DATA_MAP:
+            continue
+
+        values = channels[curve.data_path]
+        if curve.array_index >= values.shape[1]:
+            continue
+
+        values[:, curve.array_index] = sample_fcurve(curve, frames)
+        used.add(curve.data_path)
+
+    x, y, z = channels['location'].T
+    location = numpy.stack([x, z, y], axis=-1)
+
+    rotation = channels['rotation_quaternion']
+    if 'rotation_quaternion' not in used and 'rotation_euler' in used:
+        rotation = euler_to_quaternion(channels['rotation_euler'])
+
+    norm = numpy.linalg.norm(rotation, axis=1, keepdims=True)
+    rotation = numpy.where(norm > 0, rotation / numpy.where(norm > 0, norm, 1), [1.0, 0.0, 0.0, 0.0])
+
+    w, x, y, z = rotation.T
+    rotation = numpy.stack([-x, -z, -y, w], axis=-1)
+
+    x, y, z = channels['scale'].T
+    scale = numpy.stack([x, z, y], axis=-1)
+
+    return location, rotation, scale
+
+
 class HTAConfing(bpy.types.AddonPreferences):
     bl_idname = __package__
 
@@ -163,21 +407,219 @@ class HTAConfing(bpy.types.AddonPreferences):
         layout.prop(self, 'collider_type')
         layout.prop(self, 'shader_name')
         layout.prop(self, 'model_sign')
+        layout.operator(f'{__package__}.rebuildindex'.lower())
 
 
 bpy.utils.register_class(HTAConfing)
 preferences = bpy.context.preferences.addons[__package__].preferences
 
 
-def search_file(name: str) -> str:
-    if not preferences.game_path:
-        return None
+class TextureIndex:
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.root = None
+        self.directories = dict()
+        self.files = dict()
+
+    def load(self):
+        if not os.path.isfile(self.path):
+            return
+
+        try:
+            with open(self.path, 'r', encoding='utf-8') as stream:
+                data = json.load(stream)
+
+        except (OSError, ValueError):
+            print(f'Texture index "{self.path}" is broken - rebuilding')
+            return
+
+        self.root = data.get('root')
+        self.directories = data.get('directories', dict())
+
+    def save(self):
+        try:
+            with open(self.path, 'w', encoding='utf-8') as stream:
+                json.dump(dict(root=self.root, directories=self.directories), stream)
+
+        except OSError as error:
+            print(f'Cant save texture index: {error}')
+
+    def refresh(self, root: str, rebuild: bool = False) -> int:
+        root = os.path.normpath(root)
+
+        if rebuild or root != self.root:
+            self.root = root
+            self.directories = dict()
+
+        directories = dict()
+        files = dict()
+        changed = False
+        stack = [root]
+
+        while stack:
+            path = stack.pop()
+
+            try:
+                mtime = os.stat(path).st_mtime_ns
+
+            except OSError:
+                continue
+
+            entry = self.directories.get(path)
+
+            if entry is None or entry[0] != mtime:
+                names = list()
+                folders = list()
+
+                try:
+                    with os.scandir(path) as scan:
+                        for item in scan:
+                            if item.is_dir(follow_symlinks=False):
+                                folders.append(item.name)
+                            else:
+                                names.append(item.name)
+
+                except OSError:
+                    continue
+
+                entry = [mtime, names, folders]
+                changed = True
+
+            directories[path] = entry
+
+            for name in entry[1]:
+                files.setdefault(name, os.path.join(path, name))
+
+            stack.extend(os.path.join(path, name) for name in reversed(entry[2]))
+
+        changed = changed or len(directories) != len(self.directories)
+
+        self.directories = directories
+        self.files = files
+
+        if changed:
+            self.save()
+
+        return len(files)
+
+    def find(self, name: str) -> str:
+        return self.files.get(name)
+
+
+texture_index = TextureIndex(os.path.join(bpy.utils.user_resource('CONFIG', path='htatools', create=True), 'texture_index.json'))
+texture_index.load()
+
 
-    for root, _, files in os.walk(preferences.game_path):
-        if name in files:
-            return os.path.join(root, name)
+def resolve_texture(directory: str, name: str, game_path: str = None, read: bool = True) -> tuple:
+    filepath = os.path.join(directory, name)
 
-    return None
+    if not os.path.isfile(filepath):
+        filepath = texture_index.find(name) if game_path else None
+
+    if not filepath:
+        return name, None, 'not found'
+
+    if not read:
+        return name, filepath, None
+
+    try:
+        with open(filepath, 'rb') as stream:
+            header = stream.read(4)
+
+    except OSError as error:
+        return name, None, str(error)
+
+    if not header:
+        return name, None, 'empty file'
+
+    if filepath.lower().endswith('.dds') and header != b'DDS ':
+        return name, None, 'not a DDS file'
+
+    return name, filepath, None
+
+
+def texture_pixels(pixels: numpy.ndarray, channels: int, linear: bool = False) -> numpy.ndarray:
+    pixels = numpy.clip(pixels.reshape(-1, channels), 0, 1)
+    colors = channels - (channels in (2, 4))
+
+    if linear:
+        color = pixels[:, :colors]
+        pixels[:, :colors] = numpy.where(color <= 0.0031308, color * 12.92, 1.055 * color ** (1 / 2.4) - 0.055)
+
+    pixels = (pixels * 255 + 0.5).astype(numpy.uint8)
+
+    data = numpy.full((len(pixels), 4), 255, dtype=numpy.uint8)
+    data[:, :3] = pixels[:, [2, 1, 0] if colors == 3 else [0, 0, 0]]
+
+    if colors < channels:
+        data[:, 3] = pixels[:, -1]
+
+    return data
+
+
+def encode_tga(data: numpy.ndarray, width: int, height: int) -> bytes:
+    values = data.view('<u4').ravel()
+    raw = data.tobytes()
+
+    change = numpy.ones(len(values), dtype=bool)
+    change[1:] = values[1:] != values[:-1]
+    change[::width] = True
+
+    starts = numpy.flatnonzero(change).tolist()
+    chunks = [struct.pack('<3BHHB4H2B', 0, 0, 10, 0, 0, 0, 0, 0, width, height, 32, 8)]
+
+    def literal(first, last):
+        for offset in range(first, last, 128):
+            count = min(128, last - offset)
+            chunks.append(bytes((count - 1,)) + raw[offset * 4:(offset + count) * 4])
+
+    pending = -1
+
+    for start, end in zip(starts, starts[1:] + [len(values)]):
+        if pending >= 0 and (end - start > 1 or start % width == 0):
+            literal(pending, start)
+            pending = -1
+
+        if end - start > 1:
+            for offset in range(start, end, 128):
+                chunks.append(bytes((0x80 | min(128, end - offset) - 1,)) + raw[offset * 4:offset * 4 + 4])
+
+        elif pending < 0:
+            pending = start
+
+    if pending >= 0:
+        literal(pending, len(values))
+
+    return b''.join(chunks)
+
+
+def write_texture(filepath: str, pixels: numpy.ndarray, width: int, height: int) -> bool:
+    data = encode_tga(pixels, width, height)
+
+    if os.path.isfile(filepath) and os.path.getsize(filepath) == len(data):
+        with open(filepath, 'rb') as stream:
+            if stream.read() == data:
+                return False
+
+    with open(filepath, 'wb') as stream:
+        stream.write(data)
+
+    return True
+
+
+class HTA_OT_RebuildIndex(bpy.types.Operator):
+    bl_idname = f'{__package__}.rebuildindex'.lower()
+    bl_label = 'Rebuild Texture Index'
+
+    def execute(self, context):
+        if not preferences.game_path:
+            self.report({'WARNING'}, 'Game path is not set')
+            return {'CANCELLED'}
+
+        count = texture_index.refresh(preferences.game_path, rebuild=True)
+        self.report({'INFO'}, f'Texture index: {count} files')
+
+        return {'FINISHED'}
 
 
 def HTA_PG_Object_update(self, context):
@@ -375,6 +817,7 @@ class HTAImport(bpy.types.Operator, bpy_extras.io_utils.ImportHelper):
     def execute(self, context):
         provider = htaparser.Parser()
         provider.t2m_name = True
+        provider.columnar = True
         provider.mode = self.game_version
         provider.file = self.filepath[-3:].upper()
 
@@ -386,8 +829,37 @@ class HTAImport(bpy.types.Operator, bpy_extras.io_utils.ImportHelper):
         print(f'Load file: "{provider.file}" at mode: "{provider.mode}"')
         scene = bpy.context.scene
 
-        with open(self.filepath, 'rb') as stream:
-            provider.load(stream)
+        provider.load_mmap(self.filepath)
+
+        print('Import: Textures')
+        game_path = preferences.game_path
+        read = self.imp_textures
+
+        if game_path:
+            texture_index.refresh(game_path)
+
+        names = set()
+        for skin in provider.skins:
+            for item in skin.values():
+                names.update(tex_item.filename for tex_item in item.textures)
+
+        names = sorted(name for name in names if name not in bpy.data.images)
+        missing = set()
+
+        with concurrent.futures.ThreadPoolExecutor() as executor:
+            results = list(executor.map(lambda name: resolve_texture(model_directory, name, game_path, read), names))
+
+        for name, filepath, error in results:
+            if error:
+                print(f'Texture "{name}": {error} - skipped!')
+                missing.add(name)
+                continue
+
+            if self.imp_textures:
+                bpy.data.images.load(filepath, check_existing=True)
+
+        if missing:
+            self.report({'WARNING'}, f'{len(missing)} textures not found, see console')
 
         print('Import: Materials')
         for skin in provider.skins:
@@ -399,17 +871,8 @@ class HTAImport(bpy.types.Operator, bpy_extras.io_utils.ImportHelper):
                 root = mtl.node_tree.nodes["Principled BSDF"]
 
                 for tex_item in item.textures:
-                    if tex_item.filename not in bpy.data.images:
-                        filepath = os.path.join(model_directory, tex_item.filename)
-
-                        if not os.path.isfile(filepath):
-                            filepath = search_file(tex_item.filename)
-
-                        if not filepath:
-                            continue
-
-                        if self.imp_textures:
-                            bpy.data.images.load(filepath, check_existing=True)
+                    if tex_item.filename in missing:
+                        continue
 
                     node = mtl.node_tree.nodes.new('ShaderNodeTexImage')
                     node.name = TEXTURE_TYPES[tex_item.type]
@@ -480,63 +943,33 @@ class HTAImport(bpy.types.Operator, bpy_extras.io_utils.ImportHelper):
             mesh = bpy.data.meshes.new(item.name)
 
             obj_item = provider.nodes.by_index(item.parent)
-            inverse = mathutils.Matrix([
-                obj_item.matrix[0:4],
-                obj_item.matrix[4:8],
-                obj_item.matrix[8:12],
-                obj_item.matrix[12:16]
-            ]).transposed()
-
-            vertices = []
-            for vert in item.vertices:
-                x, y, z, *w = vert.location
-                location = mathutils.Vector([x, y, z, w or 1.0])
-
-                x, y, z, w = inverse @ location
-                vertices.append([x, z, y])
-
-            indices = [[i2, i1, i0] for i0, i1, i2 in item.indices]
-
-            mesh.from_pydata(vertices, [], indices)
-
-            for face in mesh.polygons:
-                for vert_id, loop_id in zip(face.vertices, face.loop_indices):
-                    vert = item.vertices[vert_id]
-                    if vert.normal:
-                        normal = mathutils.Vector([*vert.normal, 0.0])
-                        x, y, z, _ = inverse @ normal
-                        mesh.loops[loop_id].normal = [x, z, y]
-
-                    if vert.uv0:
-                        x, y, *_ = vert.uv0
-                        if 'uv0' not in mesh.uv_layers:
-                            mesh.uv_layers.new(name='uv0')
-                        layer = mesh.uv_layers['uv0']
-                        layer.data[loop_id].uv = [x, 1 - y]
-
-                    if vert.uv1:
-                        x, y, *_ = vert.uv1
-                        if 'uv1' not in mesh.uv_layers:
-                            mesh.uv_layers.new(name='uv1')
-                        layer = mesh.uv_layers['uv1']
-                        layer.data[loop_id].uv = [x, 1 - y]
-
-                    if vert.uv2:
-                        x, y, *_ = vert.uv2
-                        if 'uv2' not in mesh.uv_layers:
-                            mesh.uv_layers.new(name='uv2')
-                        layer = mesh.uv_layers['uv2']
-                        layer.data[loop_id].uv = [x, 1 - y]
-
-                    if vert.color:
-                        if 'color' not in mesh.vertex_colors:
-                            mesh.vertex_colors.new(name='color')
-                        layer = mesh.vertex_colors['color']
-                        r, g, b, a = [v / 255 for v in vert.color]
-                        layer.data[loop_id].color = [r, g, b, a]
-
-            for f in mesh.polygons:
-                f.use_smooth = True
+            inverse = numpy.array(obj_item.matrix, dtype=numpy.float64).reshape(4, 4).T
+
+            columns = mesh_columns(item)
+            vertices = transform_vertices(inverse, columns['location'], 1.0)
+
+            indices = numpy.frombuffer(item.indices.data, dtype=numpy.uint16).reshape(-1, 3)
+            loops = build_mesh(mesh, vertices, indices)
+
+            for name in ('uv0', 'uv1', 'uv2'):
+                if name in columns:
+                    uv = numpy.array(columns[name][:, :2], dtype=numpy.float32)
+                    uv[:, 1] = 1 - uv[:, 1]
+
+                    layer = mesh.uv_layers.new(name=name)
+                    layer.data.foreach_set('uv', uv[loops].ravel())
+
+            if 'color' in columns:
+                color = numpy.asarray(columns['color'], dtype=numpy.float32) / 255
+
+                layer = mesh.vertex_colors.new(name='color')
+                layer.data.foreach_set('color', color[loops].ravel())
+
+            if 'normal' in columns:
+                normals = transform_vertices(inverse, columns['normal'], 0.0)
+
+                mesh.use_auto_smooth = True
+                mesh.normals_split_custom_set_from_vertices(normals)
 
             obj = bpy.data.objects.new(obj_item.name, mesh)
             obj.htatools.draw_mode = str(item.type)
@@ -633,40 +1066,47 @@ class HTAImport(bpy.types.Operator, bpy_extras.io_utils.ImportHelper):
         if self.imp_animation:
             print('Import: Animations')
             for animation in provider.animations:
-                targets = []
-                for num, frame in enumerate(animation.frames):
-                    for key in frame.values():
-                        item = provider.nodes.by_index(key.node)
-                        node = bpy.data.objects[item.name]
-                        targets.append(node)
+                if not animation.frame_count:
+                    continue
 
-                        x, y, z = key.location
-                        node.location = [x, z, y]
+                frames = numpy.arange(animation.frame_count, dtype=numpy.float32)
 
-                        x, y, z, w = key.rotation
-                        node.rotation_quaternion = [w, -x, -z, -y]
+                locations = numpy.asarray(animation.locations, dtype=numpy.float32)[..., [0, 2, 1]]
 
-                        x, y, z = key.scale
-                        node.scale = [x, z, y]
+                x, y, z, w = numpy.moveaxis(numpy.asarray(animation.rotations, dtype=numpy.float32), -1, 0)
+                rotations = numpy.stack([w, -x, -z, -y], axis=-1)
 
-                        node.keyframe_insert(data_path='location', frame=num)
-                        node.keyframe_insert(data_path='rotation_quaternion', frame=num)
-                        node.keyframe_insert(data_path='scale', frame=num)
+                if animation.scales is None:
+                    scales = numpy.ones_like(locations)
+                else:
+                    scales = numpy.asarray(animation.scales, dtype=numpy.float32)[..., [0, 2, 1]]
+
+                for key_num, node_num in enumerate(animation.nodes):
+                    item = provider.nodes.by_index(int(node_num))
+                    node = bpy.data.objects[item.name]
 
-                        node.animation_data.action.name = f'{animation.name}({node.name})'
+                    action = bpy.data.actions.new(f'{animation.name}({node.name})')
+                    action.id_root = 'OBJECT'
 
-                for node in targets:
-                    action = node.animation_data.action
+                    channels = (
+                        ('location', locations[:, key_num]),
+                        ('rotation_quaternion', rotations[:, key_num]),
+                        ('scale', scales[:, key_num]),
+                    )
 
-                    if action:
-                        nla = node.animation_data.nla_tracks.new()
-                        nla.name = action.name
+                    for path, values in channels:
+                        for index in range(values.shape[1]):
+                            curve = action.fcurves.new(path, index=index, action_group='Object Transforms')
+                            curve.keyframe_points.add(len(frames))
+                            curve.keyframe_points.foreach_set('co', numpy.column_stack([frames, values[:, index]]).ravel())
+                            curve.update()
 
-                        if '(' in nla.name:
-                            nla.name = nla.name[:nla.name.index('(')]
+                    if node.animation_data is None:
+                        node.animation_data_create()
 
-                        nla.strips.new(animation.name, int(action.frame_range[0] + 0.5), action)
-                        node.animation_data.action = None
+                    nla = node.animation_data.nla_tracks.new()
+                    nla.name = animation.name
+                    nla.strips.new(animation.name, 0, action)
 
         return {'FINISHED'}
 
@@ -697,15 +1137,29 @@ class HTAExport(bpy.types.Operator, bpy_extras.io_utils.ExportHelper):
         default=False,
     )
 
+    optimize_indices: bpy.props.BoolProperty(
+        name='Optimize Vertex Cache',
+        default=False,
+    )
+
+    quantize_animations: bpy.props.BoolProperty(
+        name='Quantize Animations',
+        default=False,
+    )
+
     def execute(self, context):
         if self.make_backup and os.path.isfile(self.filepath):
             shutil.copy(self.filepath, self.filepath + '.bak')
 
         model_directory = os.path.dirname(self.filepath)
+        images = dict()
+        samples = dict()
 
         provider = htaparser.Parser()
         provider.mode = self.game_version
         provider.file = self.filepath[-3:].upper()
+        provider.vertex_cache = 16 if self.optimize_indices else 0
+        provider.quantize = 16 if self.quantize_animations else 0
 
         for item in bpy.data.objects:
             if item.type != 'MESH' and item.htatools.object_type == 'CONVEX':
@@ -780,36 +1234,19 @@ class HTAExport(bpy.types.Operator, bpy_extras.io_utils.ExportHelper):
 
                         anim = provider.animations[track.name]
 
-                        for frame in range(anim.frame_count):
-                            key = htaparser.Key()
-                            key.location = []
-                            key.rotation = []
-                            key.scale = []
-                            key.node = node_index
-
-                            for curve in action.fcurves:
-                                path = ANIM_DATA_MAP.get(curve.data_path)
-                                value = getattr(key, path)
-                                value.append(curve.evaluate(frame))
+                        if (action.name, anim.frame_count) not in samples:
+                            samples[action.name, anim.frame_count] = sample_action(action, anim.frame_count)
 
-                            x, y, z = key.location or [0, 0, 0]
-                            key.location = [x, z, y]
+                        locations, rotations, scales = samples[action.name, anim.frame_count]
 
-                            if len(key.rotation) == 4:
-                                rot = mathutils.Quaternion(key.rotation or [1, 0, 0, 0])
-                                rot.normalize()
-                                w, x, y, z = rot
-                                key.rotation = [-x, -z, -y, w]
-
-                            elif len(key.rotation) == 3:
-                                rot = mathutils.Euler(key.rotation or [0, 0, 0], 'XYZ')
-                                w, x, y, z = rot.to_quaternion().normalized()
-                                key.rotation = [-x, -z, -y, w]
-
-                            x, y, z = key.scale or [1, 1, 1]
-                            key.scale = [x, z, y]
+                        for frame, location, rotation, scale in zip(anim.frames, locations.tolist(), rotations.tolist(), scales.tolist()):
+                            key = htaparser.Key()
+                            key.node = node_index
+                            key.location = location
+                            key.rotation = rotation
+                            key.scale = scale
 
-                            anim.frames[frame].append(key)
+                            frame.append(key)
 
         for item in bpy.data.objects:
             if item.type != 'MESH' and item.htatools.object_type == 'CONVEX':
@@ -907,13 +1344,7 @@ class HTAExport(bpy.types.Operator, bpy_extras.io_utils.ExportHelper):
                                 texture.uv = item.data.uv_layers.keys().index(uvnode.uv_map)
 
                             if self.export_images:
-                                tex_path = os.path.join(model_directory, pointer.image.name)
-
-                                if pointer.image.file_format != 'TARGA':
-                                    pointer.image.file_format = 'TARGA'
-
-                                pointer.image.filepath_raw = tex_path
-                                pointer.image.save()
+                                images[pointer.image.name] = pointer.image
 
                             mtl.textures.append(texture)
 
@@ -927,13 +1358,10 @@ class HTAExport(bpy.types.Operator, bpy_extras.io_utils.ExportHelper):
                 mesh.parent = provider.nodes.index(item.name)
                 mesh.group = provider.groups.index(group_name)
 
-                skins = list(provider.skins[0].keys())
+                material_index = -1
 
-                if item.data.materials and item.data.materials[0].name in skins:
-                    material_index = list(provider.skins[0].keys()).index(item.data.materials[0].name)
-
-                else:
-                    material_index = -1
+                if item.data.materials:
+                    material_index = provider.skins[0].index(item.data.materials[0].name)
 
                 mesh.material = material_index
                 mesh.vertex_type = int(item.htatools.vertex_type)
@@ -943,98 +1371,80 @@ class HTAExport(bpy.types.Operator, bpy_extras.io_utils.ExportHelper):
                 bm = bmesh.new()
                 bm.from_mesh(data)
                 bmesh.ops.triangulate(bm, faces=bm.faces[:])
-                seams = [edge for edge in bm.edges if edge.seam or not edge.smooth]
-                bmesh.ops.split_edges(bm, edges=seams)
                 bm.to_mesh(data)
                 bm.free()
 
-                data.calc_tangents()
+                if not data.use_auto_smooth:
+                    data.use_auto_smooth = True
+                    data.auto_smooth_angle = math.pi
 
-                verts = dict()
-                local = dict()
+                names = htaparser.vertex_dtype(mesh.vertex_type).names
 
-                uv_layers = data.uv_layers
-                uv_names = list(data.uv_layers.keys())
-
-                for face in data.polygons:
-                    vertexes = [face.vertices[0], face.vertices[1], face.vertices[2],]
-                    mesh.indices.append(vertexes[::-1])
-
-                    for loop_id, vert_id in zip(face.loop_indices, vertexes):
-                        if vert_id in verts:
-                            continue
-
-                        vert = data.vertices[vert_id]
+                if 'tangent' in names:
+                    data.calc_tangents()
+                else:
+                    data.calc_normals_split()
 
-                        _data = htaparser.Vertex()
+                columns = loop_columns(data, names)
+                bpy.data.meshes.remove(data)
 
-                        tx, ty, tz = data.loops[loop_id].tangent
-                        tw = data.loops[loop_id].bitangent_sign
-                        _data.tangent = [tx, tz, ty, tw]
+                first, remap = weld_loops(columns)
 
-                        if len(uv_names) >= 1:
-                            layer = uv_layers[uv_names[0]]
-                            ux, uy = layer.data[loop_id].uv
-                            _data.uv0 = [ux, 1 - uy]
+                if len(first) > 65536:
+                    raise ValueError(f'Mesh "{mesh.name}" has {len(first)} vertices, the format supports at most 65536')
 
-                        if len(uv_names) >= 2:
-                            layer = uv_layers[uv_names[1]]
-                            ux, uy = layer.data[loop_id].uv
-                            _data.uv1 = [ux, 1 - uy]
+                local = {name: value[first] for name, value in columns.items()}
+                verts = dict(local)
 
-                        if len(uv_names) >= 3:
-                            layer = uv_layers[uv_names[2]]
-                            ux, uy = layer.data[loop_id].uv
-                            _data.uv2 = [ux, 1 - uy]
+                if mesh.type == 4:
+                    matrix = numpy.array(item.matrix_world)
+                    verts['location'] = transform_vertices(matrix, local['location'][:, [0, 2, 1]], 1.0)
 
-                        if 'color' in data.vertex_colors:
-                            layer = data.vertex_colors['color']
-                            color = list(layer.data[loop_id].color)
-                            r, g, b, a = [int(v * 255) for v in color]
-                            _data.color = [r, g, b, a]
+                    if 'normal' in local:
+                        verts['normal'] = transform_vertices(matrix, local['normal'][:, [0, 2, 1]], 0.0)
 
-                        px, py, pz = vert.co
-                        nx, ny, nz = data.loops[loop_id].normal
+                indices = remap.reshape(-1, 3)[:, ::-1]
+                mesh.indices.data.frombytes(numpy.ascontiguousarray(indices, dtype=numpy.uint16).tobytes())
+                mesh.set_columns(verts, local)
 
-                        _data.location = [px, pz, py]
-                        _data.normal = [nx, nz, ny]
+                if len(first):
+                    location = verts['location']
+                    provider.meshes.bvh_min = numpy.minimum(provider.meshes.bvh_min, location.min(axis=0)).tolist()
+                    provider.meshes.bvh_max = numpy.maximum(provider.meshes.bvh_max, location.max(axis=0)).tolist()
+                provider.meshes.items[mesh.name] = mesh
 
-                        local[vert_id] = _data.copy
+                group = provider.groups[group_name]
+                mesh_index = provider.meshes.index(mesh.name)
+                group.nodes.append(mesh_index)
+                group.add_variant(item.htatools.variant, mesh_index)
 
-                        if mesh.type == 4:
-                            px, py, pz = item.matrix_world @ vert.co
-                            nx, ny, nz, _ = item.matrix_world @ mathutils.Vector([nx, ny, nz, 0.0])
+        if images:
+            print('Export: Textures')
+            jobs = list()
 
-                            _data.location = [px, pz, py]
-                            _data.normal = [nx, nz, ny]
+            with concurrent.futures.ThreadPoolExecutor() as executor:
+                for image in images.values():
+                    width, height = image.size
 
-                        verts[vert_id] = _data
+                    if not width or not height:
+                        print(f'Texture "{image.name}" has no pixel data - skipped!')
+                        continue
 
-                        provider.meshes.bvh_min[0] = min(provider.meshes.bvh_min[0], px)
-                        provider.meshes.bvh_min[1] = min(provider.meshes.bvh_min[1], pz)
-                        provider.meshes.bvh_min[2] = min(provider.meshes.bvh_min[2], py)
+                    pixels = numpy.empty(width * height * image.channels, dtype=numpy.float32)
+                    image.pixels.foreach_get(pixels)
 
-                        provider.meshes.bvh_max[0] = max(provider.meshes.bvh_max[0], px)
-                        provider.meshes.bvh_max[1] = max(provider.meshes.bvh_max[1], pz)
-                        provider.meshes.bvh_max[2] = max(provider.meshes.bvh_max[2], py)
+                    linear = image.is_float and image.colorspace_settings.name != 'Non-Color'
+                    pixels = texture_pixels(pixels, image.channels, linear)
 
-                order = list(verts.keys())
-                order.sort()
-                for vert_id in order:
-                    mesh.vertices.append(verts[vert_id])
+                    tex_path = os.path.join(model_directory, image.name)
+                    image.file_format = 'TARGA'
+                    image.filepath_raw = tex_path
 
-                order = list(local.keys())
-                order.sort()
-                for vert_id in order:
-                    mesh.doubles.append(local[vert_id])
+                    jobs.append(executor.submit(write_texture, tex_path, pixels, width, height))
 
-                bpy.data.meshes.remove(data)
-                provider.meshes.items[mesh.name] = mesh
+                written = sum(job.result() for job in jobs)
 
-                group = provider.groups[group_name]
-                mesh_index = provider.meshes.index(mesh.name)
-                group.nodes.append(mesh_index)
-                group.add_variant(item.htatools.variant, mesh_index)
+            print(f'Export: {written} textures written, {len(jobs) - written} up to date')
 
         version = '%i.%i.%i' % bl_info['version']
         provider.generator.value += f' HTATools: {version}'
@@ -1065,6 +1475,7 @@ def register():
     bpy.types.Material.htatools = bpy.props.PointerProperty(type=HTA_PG_Material)
     bpy.utils.register_class(HTA_PT_Material)
 
+    bpy.utils.register_class(HTA_OT_RebuildIndex)
     bpy.utils.register_class(HTAImport)
     bpy.utils.register_class(HTAExport)
 
@@ -1079,6 +1490,7 @@ def unregister():
     bpy.utils.unregister_class(HTA_PG_Material)
     bpy.utils.unregister_class(HTA_PT_Material)
 
+    bpy.utils.unregister_class(HTA_OT_RebuildIndex)
     bpy.utils.unregister_class(HTAImport)
     bpy.utils.unregister_class(HTAExport)
 
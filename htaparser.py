@@ -1,13 +1,42 @@
 from __future__ import annotations
+import argparse
+import array
+import concurrent.futures
+import contextlib
+import heapq
 import io
+import json
+import math
+import mmap
+import os
 import pathlib
 import struct
+import sys
+import time
 from typing import List
 
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
 
 __version__ = '2.4.13'
 
 
+STRUCTS = dict()
+
+
+def get_struct(fmt: str) -> struct.Struct:
+    compiled = STRUCTS.get(fmt)
+
+    if compiled is None:
+        compiled = struct.Struct(fmt)
+        STRUCTS[fmt] = compiled
+
+    return compiled
+
+
 class IOWrapper:
     def __init__(self, stream: io.FileIO) -> None:
         self.stream = stream
@@ -30,16 +59,16 @@ class IOWrapper:
 
     def read(self, count: int = 0):
         result = self.stream.read(count)
-        self.offset += count
+        self._offset += count
         return result
 
     def unpack(self, fmt: str):
-        size = struct.calcsize(fmt)
+        compiled = get_struct(fmt)
 
-        buffer = self.stream.read(size)
-        result = struct.unpack(fmt, buffer)
+        buffer = self.stream.read(compiled.size)
+        result = compiled.unpack(buffer)
 
-        self.offset += size
+        self._offset += compiled.size
 
         if len(result) == 1:
             return result[0]
@@ -48,16 +77,240 @@ class IOWrapper:
             return list(result)
 
     def iter_unpack(self, fmt: str, count: int):
-        for _ in range(count):
-            yield self.unpack(fmt)
+        compiled = get_struct(fmt)
+        buffer = self.read(compiled.size * count)
+
+        return compiled.iter_unpack(buffer)
 
     def pack(self, fmt: str, *args):
-        self.stream.write(struct.pack(fmt, *args))
+        self.stream.write(get_struct(fmt).pack(*args))
 
     def write(self, data: bytes):
         self.stream.write(data)
 
 
+class BufferWrapper(IOWrapper):
+    def __init__(self, buffer: bytes) -> None:
+        self.stream = None
+        self.buffer = memoryview(buffer)
+        self._offset = 0
+
+    def __exit__(self, _type, _value, _traceback):
+        self.buffer.release()
+
+    def close(self):
+        source = self.buffer.obj
+        self.buffer.release()
+
+        if isinstance(source, mmap.mmap):
+            source.close()
+
+    @property
+    def offset(self):
+        return self._offset
+
+    @offset.setter
+    def offset(self, value: int):
+        self._offset = value
+
+    def read(self, count: int = 0):
+        if self._offset + count > len(self.buffer):
+            raise struct.error(f'read requires {count} bytes at offset {self._offset}, buffer has {len(self.buffer)}')
+
+        result = self.buffer[self._offset:self._offset + count].tobytes()
+        self._offset += count
+        return result
+
+    def unpack(self, fmt: str):
+        compiled = get_struct(fmt)
+        result = compiled.unpack_from(self.buffer, self._offset)
+
+        self._offset += compiled.size
+
+        if len(result) == 1:
+            return result[0]
+
+        else:
+            return list(result)
+
+    def iter_unpack(self, fmt: str, count: int):
+        compiled = get_struct(fmt)
+        size = compiled.size * count
+
+        if self._offset + size > len(self.buffer):
+            raise struct.error(f'iter_unpack requires {size} bytes at offset {self._offset}, buffer has {len(self.buffer)}')
+
+        return compiled.iter_unpack(self.read(size))
+
+    def pack(self, fmt: str, *args):
+        compiled = get_struct(fmt)
+        compiled.pack_into(self.buffer, self._offset, *args)
+
+        self._offset += compiled.size
+
+    def write(self, data: bytes):
+        self.buffer[self._offset:self._offset + len(data)] = data
+        self._offset += len(data)
+
+
+class IndexedDict(dict):
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__()
+        self.order = list()
+        self.positions = dict()
+        self.update(*args, **kwargs)
+
+    def __reduce__(self):
+        return (type(self), (list(self.items()),))
+
+    def __setitem__(self, key, value):
+        if key not in self.positions:
+            self.positions[key] = len(self.order)
+            self.order.append(key)
+
+        super().__setitem__(key, value)
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self.reindex()
+
+    def pop(self, key, *default):
+        if key not in self:
+            if default:
+                return default[0]
+
+            raise KeyError(key)
+
+        value = super().__getitem__(key)
+        del self[key]
+
+        return value
+
+    def popitem(self):
+        if not self.order:
+            raise KeyError('popitem(): dictionary is empty')
+
+        key = self.order[-1]
+        return key, self.pop(key)
+
+    def clear(self):
+        super().clear()
+        self.order.clear()
+        self.positions.clear()
+
+    def __ior__(self, other):
+        self.update(other)
+        return self
+
+    def update(self, *args, **kwargs):
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+
+        return super().__getitem__(key)
+
+    def reindex(self):
+        self.order = list(self.keys())
+        self.positions = {key: num for num, key in enumerate(self.order)}
+
+    def index(self, key) -> int:
+        return self.positions.get(key, -1)
+
+    def by_index(self, key: int):
+        if len(self.order) <= key or key < 0:
+            return None
+
+        return super().__getitem__(self.order[key])
+
+
+def key_dtype(file: str):
+    if file == 'GAM':
+        return numpy.dtype([('node', '<i2'), ('location', '<f4', (3,)), ('rotation', '<f4', (4,))])
+
+    if file == 'SAM':
+        return numpy.dtype([('location', '<f4', (3,)), ('rotation', '<f4', (4,)), ('scale', '<f4', (3,))])
+
+
+def slerp(a, b, t: float):
+    dot = numpy.sum(a * b, axis=-1, keepdims=True)
+    b = numpy.where(dot < 0, -b, b)
+    dot = numpy.clip(numpy.abs(dot), 0.0, 1.0)
+
+    theta = numpy.arccos(dot)
+    sin = numpy.sin(theta)
+    small = sin < 1e-6
+    sin = numpy.where(small, 1.0, sin)
+
+    wa = numpy.where(small, 1.0 - t, numpy.sin((1.0 - t) * theta) / sin)
+    wb = numpy.where(small, t, numpy.sin(t * theta) / sin)
+
+    return wa * a + wb * b
+
+
+def angle_between(a, b):
+    a = a / numpy.linalg.norm(a, axis=-1, keepdims=True)
+    b = b / numpy.linalg.norm(b, axis=-1, keepdims=True)
+    dot = numpy.clip(numpy.abs(numpy.sum(a * b, axis=-1)), 0.0, 1.0)
+
+    return 2.0 * numpy.arccos(dot)
+
+
+def encode_rotations(rotations):
+    quats = numpy.asarray(rotations, dtype='<f8').reshape(-1, 4)
+    quats = quats / numpy.linalg.norm(quats, axis=1, keepdims=True)
+
+    largest = numpy.argmax(numpy.abs(quats), axis=1)
+    sign = numpy.where(quats[numpy.arange(len(quats)), largest] < 0, -1.0, 1.0)
+    quats = quats * sign[:, None]
+
+    mask = numpy.arange(4) == largest[:, None]
+    others = quats[~mask].reshape(-1, 3) * numpy.sqrt(2.0)
+    others = numpy.clip(numpy.round((others + 1.0) * 511.0), 0, 1022).astype('<u4')
+
+    packed = (largest.astype('<u4') << 30) | (others[:, 0] << 20) | (others[:, 1] << 10) | others[:, 2]
+
+    return packed.reshape(numpy.shape(rotations)[:-1])
+
+
+def decode_rotations(packed):
+    shape = numpy.shape(packed)
+    packed = numpy.asarray(packed, dtype='<u4').reshape(-1)
+
+    largest = packed >> 30
+    others = numpy.stack([(packed >> 20) & 1023, (packed >> 10) & 1023, packed & 1023], axis=1)
+    others = (others / 511.0 - 1.0) / numpy.sqrt(2.0)
+
+    mask = numpy.arange(4) == largest[:, None]
+    quats = numpy.zeros((len(packed), 4))
+    quats[mask] = numpy.sqrt(numpy.clip(1.0 - numpy.sum(others ** 2, axis=1), 0.0, None))
+    quats[~mask] = others.reshape(-1)
+
+    return quats.reshape(*shape, 4)
+
+
+def encode_locations(locations, bits: int = 16):
+    locations = numpy.asarray(locations, dtype='<f8')
+    points = locations.reshape(-1, 3)
+
+    low = points.min(axis=0) if len(points) else numpy.zeros(3)
+    high = points.max(axis=0) if len(points) else numpy.zeros(3)
+    span = numpy.where(high > low, high - low, 1.0)
+
+    dtype = '<u2' if bits <= 16 else '<u4'
+    packed = numpy.round((locations - low) / span * (2 ** bits - 1)).astype(dtype)
+
+    return packed, low, high
+
+
+def decode_locations(packed, low, high, bits: int = 16):
+    span = numpy.where(high > low, high - low, 1.0)
+
+    return packed / (2 ** bits - 1) * span + low
+
+
 TAG_MAP = {
     'INFO':         (0x0001, 0x0006),
     'NODES':        (0x0002, 0x0003),
@@ -190,6 +443,15 @@ class Headers:
             header.offset = offset
             offset += header.size
 
+    @property
+    def size(self):
+        size = 12 + len(self.items) * 16
+
+        for header in self.items.values():
+            size += header.size
+
+        return size
+
 
 class Info:
     def __init__(self, parser: Parser) -> None:
@@ -259,7 +521,7 @@ class Node:
 class Nodes:
     def __init__(self, parser: Parser) -> None:
         self.parser: Parser = parser
-        self.items: dict = dict()
+        self.items: IndexedDict = IndexedDict()
 
     def __getitem__(self, key: str):
         return self.items.get(key, None)
@@ -271,16 +533,10 @@ class Nodes:
         return iter(self.items.values())
 
     def index(self, key: str):
-        if key not in self.items:
-            return -1
-
-        return list(self.items.keys()).index(key)
+        return self.items.index(key)
 
     def by_index(self, key: int):
-        if len(self.items) <= key or key < 0:
-            return None
-
-        return list(self.items.values())[key]
+        return self.items.by_index(key)
 
     def recalculate(self):
         self.parser.info.nodes = len(self.items)
@@ -668,6 +924,397 @@ GAM_VERTEX2DATA = {
     16: ('<3f 3f 4B 2f 4f',  Vertex.fromXYZNCT1T),
 }
 
+GAM_VERTEX_FIELDS = {
+     0: ('location',),
+     1: ('location', 'uv0'),
+     2: ('location', 'color'),
+     3: ('location', 'color'),
+     4: ('location', 'color', 'uv0'),
+     5: ('location', 'normal', 'color'),
+     6: ('location', 'color', 'uv0'),
+     7: ('location', 'normal', 'uv0'),
+     8: ('location', 'normal', 'color', 'uv0'),
+     9: ('location', 'normal', 'color', 'uv0', 'uv1'),
+    10: ('location', 'normal', 'uv0', 'uv1'),
+    11: ('location', 'normal', 'uv0', 'uv1', 'uv2'),
+    12: ('location', 'color', 'uv0'),
+    13: ('location', 'color', 'uv0', 'uv1'),
+    14: ('location', 'color', 'uv0', 'uv1'),
+    15: ('location', 'normal', 'uv0', 'tangent'),
+    16: ('location', 'normal', 'color', 'uv0', 'tangent'),
+}
+
+VERTEX_HEADERS = {
+    'location': 0,
+    'normal':   1,
+    'color':    2,
+    'uv0':      3,
+    'uv1':      4,
+    'uv2':      5,
+    'tangent':  20,
+    'binormal': 21,
+}
+
+
+def vertex_dtype(vertex_type: int):
+    fmt, _ = GAM_DATA2VERTEX[vertex_type]
+    fields = list()
+
+    for token, name in zip(fmt[1:].split(), GAM_VERTEX_FIELDS[vertex_type]):
+        count, code = int(token[:-1]), token[-1]
+
+        if code == 'f':
+            fields.append((name, '<f4', (count,)))
+
+        if code == 'B':
+            fields.append((name, 'u1', (count,)))
+
+    return numpy.dtype(fields)
+
+
+def encode_vertices(vertex_type: int, columns: dict):
+    if numpy is None:
+        raise ImportError('Columnar meshes require numpy')
+
+    dtype = vertex_dtype(vertex_type)
+    missing = [name for name in dtype.names if columns.get(name) is None]
+
+    if missing:
+        raise ValueError(f'Vertex type {vertex_type} requires columns: {", ".join(missing)}')
+
+    count = len(columns['location'])
+    buffer = numpy.zeros(count, dtype)
+
+    if dtype['location'].shape[0] == 4:
+        buffer['location'][:, 3] = 1.0
+
+    for name in dtype.names:
+        data = numpy.asarray(columns[name]).reshape(count, -1)
+        width = min(data.shape[1], dtype[name].shape[0])
+        buffer[name][:, :width] = data[:, :width]
+
+    return buffer
+
+
+def acmr(data: array.array, cache_size: int = 16) -> float:
+    if len(data) < 3:
+        return 0.0
+
+    stamps = dict()
+    misses = 0
+
+    for vertex in data:
+        if vertex in stamps and misses - stamps[vertex] <= cache_size:
+            continue
+
+        stamps[vertex] = misses
+        misses += 1
+
+    return misses / (len(data) // 3)
+
+
+def tipsify(data: array.array, vertex_count: int, cache_size: int = 16) -> array.array:
+    triangle_count = len(data) // 3
+    adjacency = [list() for _ in range(vertex_count)]
+    live = [0] * vertex_count
+
+    for num, vertex in enumerate(data):
+        adjacency[vertex].append(num // 3)
+        live[vertex] += 1
+
+    cache_time = [0] * vertex_count
+    emitted = [False] * triangle_count
+    dead_end = list()
+    result = array.array('H')
+
+    time = cache_size + 1
+    cursor = 0
+    fanning = 0 if triangle_count else -1
+
+    while fanning >= 0:
+        candidates = list()
+
+        for triangle in adjacency[fanning]:
+            if emitted[triangle]:
+                continue
+
+            emitted[triangle] = True
+
+            for vertex in data[triangle * 3:triangle * 3 + 3]:
+                result.append(vertex)
+                dead_end.append(vertex)
+                candidates.append(vertex)
+                live[vertex] -= 1
+
+                if time - cache_time[vertex] > cache_size:
+                    cache_time[vertex] = time
+                    time += 1
+
+        fanning = -1
+        priority = -1
+
+        for vertex in candidates:
+            if not live[vertex]:
+                continue
+
+            value = 0
+            if time - cache_time[vertex] + 2 * live[vertex] <= cache_size:
+                value = time - cache_time[vertex]
+
+            if value > priority:
+                fanning, priority = vertex, value
+
+        if fanning >= 0:
+            continue
+
+        while dead_end:
+            vertex = dead_end.pop()
+
+            if live[vertex]:
+                fanning = vertex
+                break
+
+        else:
+            while cursor < vertex_count:
+                if live[cursor]:
+                    fanning = cursor
+                    break
+
+                cursor += 1
+
+    return result
+
+
+def quadric_error(q, x, y, z):
+    return (
+        q[0] * x * x + 2 * q[1] * x * y + 2 * q[2] * x * z + 2 * q[3] * x +
+        q[4] * y * y + 2 * q[5] * y * z + 2 * q[6] * y +
+        q[7] * z * z + 2 * q[8] * z + q[9]
+    )
+
+
+def triangle_normal(a, b, c):
+    ux, uy, uz = b[0] - a[0], b[1] - a[1], b[2] - a[2]
+    vx, vy, vz = c[0] - a[0], c[1] - a[1], c[2] - a[2]
+
+    return uy * vz - uz * vy, uz * vx - ux * vz, ux * vy - uy * vx
+
+
+def simplify(positions, indices, target: int, seam_weight: float = 1.0, border_weight: float = 10.0):
+    if numpy is None:
+        raise ImportError('Mesh simplification requires numpy')
+
+    positions = numpy.asarray(positions, dtype='<f8')[:, :3]
+    triangles = numpy.asarray(indices, dtype='<i8').reshape(-1, 3)
+
+    rows = numpy.ascontiguousarray(positions + 0.0)
+    _, first, shared = numpy.unique(rows.view(numpy.dtype((numpy.void, 24))).ravel(), return_index=True, return_inverse=True)
+    shared = shared.ravel()
+    points = positions[first]
+    welded = shared[triangles]
+    size = len(points)
+
+    distinct = (welded[:, 0] != welded[:, 1]) & (welded[:, 1] != welded[:, 2]) & (welded[:, 2] != welded[:, 0])
+    triangles, welded = triangles[distinct], welded[distinct]
+
+    corners = points[welded]
+    normal = numpy.cross(corners[:, 1] - corners[:, 0], corners[:, 2] - corners[:, 0])
+    area = numpy.linalg.norm(normal, axis=1)
+    normal[area > 0] /= area[area > 0, None]
+
+    a, b, c = normal.T
+    d = -(normal * corners[:, 0]).sum(axis=1)
+    planes = numpy.column_stack([a * a, a * b, a * c, a * d, b * b, b * c, b * d, c * c, c * d, d * d]) * area[:, None]
+
+    quadrics = numpy.zeros((size, 10), dtype='<f8')
+    for corner in range(3):
+        numpy.add.at(quadrics, welded[:, corner], planes)
+
+    start, end = welded.ravel(), welded[:, [1, 2, 0]].ravel()
+    start_wedge, end_wedge = triangles.ravel(), triangles[:, [1, 2, 0]].ravel()
+    owners = numpy.repeat(numpy.arange(len(triangles)), 3)
+
+    keys = numpy.minimum(start, end) * size + numpy.maximum(start, end)
+    low_wedge = numpy.where(start < end, start_wedge, end_wedge)
+    high_wedge = numpy.where(start < end, end_wedge, start_wedge)
+
+    order = numpy.argsort(keys, kind='stable')
+    _, group, counts = numpy.unique(keys[order], return_inverse=True, return_counts=True)
+    counts = counts[group.ravel()]
+
+    locked = numpy.zeros(size, dtype=bool)
+    locked[start[order][counts > 2]] = True
+    locked[end[order][counts > 2]] = True
+
+    border = numpy.zeros(size, dtype=bool)
+    border[start[order][counts == 1]] = True
+    border[end[order][counts == 1]] = True
+
+    pairs = order[counts == 2].reshape(-1, 2)
+    seam = (low_wedge[pairs[:, 0]] != low_wedge[pairs[:, 1]]) | (high_wedge[pairs[:, 0]] != high_wedge[pairs[:, 1]])
+
+    constrained = numpy.concatenate([order[counts == 1], pairs[seam].ravel()])
+    weights = numpy.concatenate([numpy.full((counts == 1).sum(), border_weight), numpy.full(seam.sum() * 2, seam_weight)])
+
+    edge = points[end[constrained]] - points[start[constrained]]
+    normal = numpy.cross(edge, normal[owners[constrained]])
+    length = numpy.linalg.norm(normal, axis=1)
+    normal[length > 0] /= length[length > 0, None]
+
+    a, b, c = normal.T
+    d = -(normal * points[start[constrained]]).sum(axis=1)
+    planes = numpy.column_stack([a * a, a * b, a * c, a * d, b * b, b * c, b * d, c * c, c * d, d * d])
+    planes *= (weights * (edge ** 2).sum(axis=1))[:, None]
+
+    numpy.add.at(quadrics, start[constrained], planes)
+    numpy.add.at(quadrics, end[constrained], planes)
+
+    edges = numpy.unique(numpy.concatenate([start * size + end, end * size + start]))
+    edges = numpy.column_stack([edges // size, edges % size])
+    edges = edges[~locked[edges[:, 0]]]
+
+    x, y, z = points[edges[:, 1]].T
+    costs = quadric_error((quadrics[edges[:, 0]] + quadrics[edges[:, 1]]).T, x, y, z)
+
+    heap = [(cost, u, v, 0, 0) for cost, (u, v) in zip(costs.tolist(), edges.tolist())]
+    heapq.heapify(heap)
+
+    result = positions.copy()
+    points = [tuple(point) for point in points.tolist()]
+    quadrics = quadrics.tolist()
+    locked = locked.tolist()
+    border = border.tolist()
+    triangles = triangles.tolist()
+    welded = welded.tolist()
+
+    faces = [set() for _ in points]
+    for num, triangle in enumerate(welded):
+        for vertex in triangle:
+            faces[vertex].add(num)
+
+    alive = [True] * len(triangles)
+    removed = [False] * len(points)
+    version = [0] * len(points)
+    count = len(triangles)
+
+    while heap and count > target:
+        _, u, v, stamp_u, stamp_v = heapq.heappop(heap)
+
+        if removed[u] or removed[v] or stamp_u != version[u] or stamp_v != version[v]:
+            continue
+
+        collapsed = faces[u] & faces[v]
+        if not collapsed:
+            continue
+
+        if border[u] and len(collapsed) != 1:
+            continue
+
+        ring_u = {vertex for num in faces[u] for vertex in welded[num]}
+        ring_v = {vertex for num in faces[v] for vertex in welded[num]}
+
+        if len(ring_u & ring_v - {u, v}) > len(collapsed):
+            continue
+
+        valid = True
+        for num in faces[u] - collapsed:
+            triangle = welded[num]
+            before = triangle_normal(*[points[vertex] for vertex in triangle])
+            after = triangle_normal(*[points[v if vertex == u else vertex] for vertex in triangle])
+
+            if before[0] * after[0] + before[1] * after[1] + before[2] * after[2] <= 0:
+                valid = False
+                break
+
+        if not valid:
+            continue
+
+        targets = dict()
+        for num in collapsed:
+            triangle = welded[num]
+            targets.setdefault(triangles[num][triangle.index(u)], set()).add(triangles[num][triangle.index(v)])
+
+        for num in collapsed:
+            alive[num] = False
+            count -= 1
+
+            for vertex in welded[num]:
+                faces[vertex].discard(num)
+
+        for num in faces[u]:
+            corner = welded[num].index(u)
+            welded[num][corner] = v
+            wedges = targets.get(triangles[num][corner], ())
+
+            if len(wedges) == 1:
+                triangles[num][corner] = next(iter(wedges))
+
+            faces[v].add(num)
+
+        faces[u] = set()
+        removed[u] = True
+        quadrics[v] = [left + right for left, right in zip(quadrics[v], quadrics[u])]
+        version[v] += 1
+
+        neighbors = {vertex for num in faces[v] for vertex in welded[num]}
+        neighbors.discard(v)
+
+        for vertex in neighbors:
+            quadric = [left + right for left, right in zip(quadrics[v], quadrics[vertex])]
+
+            if not locked[v]:
+                cost = quadric_error(quadric, *points[vertex])
+                heapq.heappush(heap, (cost, v, vertex, version[v], version[vertex]))
+
+            if not locked[vertex]:
+                cost = quadric_error(quadric, *points[v])
+                heapq.heappush(heap, (cost, vertex, v, version[vertex], version[v]))
+
+    triangles = numpy.array([triangle for num, triangle in enumerate(triangles) if alive[num]], dtype='<i8').reshape(-1, 3)
+    welded = numpy.array([triangle for num, triangle in enumerate(welded) if alive[num]], dtype='<i8').reshape(-1, 3)
+    result[triangles.ravel()] = numpy.array(points)[welded.ravel()]
+
+    return triangles, result
+
+
+class Indices:
+    def __init__(self, data: list = None) -> None:
+        self.data = array.array('H')
+
+        for triangle in data or ():
+            self.append(triangle)
+
+    def __len__(self) -> int:
+        return len(self.data) // 3
+
+    def __iter__(self):
+        return zip(self.data[0::3], self.data[1::3], self.data[2::3])
+
+    def __getitem__(self, key: int):
+        return tuple(self.data[key * 3:key * 3 + 3])
+
+    def append(self, triangle: list):
+        self.data.extend(triangle)
+
+    def validate(self, count: int) -> bool:
+        return not self.data or max(self.data) < count
+
+    def load(self, stream: IOWrapper, count: int):
+        self.data = array.array('H')
+        self.data.frombytes(stream.read(count * 6))
+
+        if sys.byteorder == 'big':
+            self.data.byteswap()
+
+    def dump(self, stream: IOWrapper):
+        data = self.data
+
+        if sys.byteorder == 'big':
+            data = array.array('H', data)
+            data.byteswap()
+
+        stream.write(data.tobytes())
+
 
 class Influence:
     node: int = 0
@@ -705,7 +1352,9 @@ class Mesh:
     vertices: list = list()
     doubles: list = list()
     influences: list = list()
-    indices: list = list()
+    indices: Indices = None
+    vertex_buffer: numpy.ndarray = None
+    double_buffer: numpy.ndarray = None
 
     def __init__(self, parser: Parser) -> None:
         self.parser = parser
@@ -713,7 +1362,114 @@ class Mesh:
         self.vertices = list()
         self.doubles = list()
         self.influences = list()
-        self.indices = list()
+        self.indices = Indices()
+        self.vertex_buffer = None
+        self.double_buffer = None
+
+    @property
+    def columnar(self):
+        return self.vertex_buffer is not None
+
+    def column(self, name: str, doubles: bool = False):
+        buffer = self.double_buffer if doubles else self.vertex_buffer
+
+        if buffer is None or name not in buffer.dtype.names:
+            return None
+
+        return buffer[name]
+
+    def set_columns(self, columns: dict, doubles: dict = None):
+        self.vertex_buffer = encode_vertices(self.vertex_type, columns)
+        self.double_buffer = None
+
+        if doubles is not None:
+            self.double_buffer = encode_vertices(self.vertex_type, doubles)
+
+    def optimize_indices(self, cache_size: int = 16, reorder: bool = True) -> dict:
+        count = len(self.vertex_buffer) if self.columnar else len(self.vertices)
+        before = acmr(self.indices.data, cache_size)
+
+        self.indices.data = tipsify(self.indices.data, count, cache_size)
+
+        if reorder:
+            self.reorder_vertices()
+
+        return dict(before=before, after=acmr(self.indices.data, cache_size))
+
+    def reorder_vertices(self):
+        count = len(self.vertex_buffer) if self.columnar else len(self.vertices)
+        remap = [-1] * count
+        order = list()
+
+        for vertex in self.indices.data:
+            if remap[vertex] < 0:
+                remap[vertex] = len(order)
+                order.append(vertex)
+
+        for vertex in range(count):
+            if remap[vertex] < 0:
+                remap[vertex] = len(order)
+                order.append(vertex)
+
+        self.indices.data = array.array('H', [remap[vertex] for vertex in self.indices.data])
+
+        if self.columnar:
+            self.vertex_buffer = self.vertex_buffer[order]
+
+            if self.double_buffer is not None and len(self.double_buffer) == count:
+                self.double_buffer = self.double_buffer[order]
+
+        else:
+            self.vertices = [self.vertices[vertex] for vertex in order]
+
+            if len(self.doubles) == count:
+                self.doubles = [self.doubles[vertex] for vertex in order]
+
+        if len(self.influences) == count:
+            self.influences = [self.influences[vertex] for vertex in order]
+
+    def decimate(self, ratio: float) -> Mesh:
+        if self.columnar:
+            positions = self.vertex_buffer['location']
+            count = len(self.vertex_buffer)
+
+        else:
+            positions = [vertex.location[:3] for vertex in self.vertices]
+            count = len(self.vertices)
+
+        triangles, positions = simplify(positions, self.indices.data, int(len(self.indices) * ratio))
+        used, remap = numpy.unique(triangles, return_inverse=True)
+
+        mesh = Mesh(self.parser)
+        mesh.name = self.name
+        mesh.type = self.type
+        mesh.parent = self.parent
+        mesh.group = self.group
+        mesh.material = self.material
+        mesh.vertex_type = self.vertex_type
+        mesh.headers = dict(self.headers)
+        mesh.indices.data = array.array('H', remap.ravel().tolist())
+
+        if self.columnar:
+            mesh.vertex_buffer = self.vertex_buffer[used]
+            mesh.vertex_buffer['location'][:, :3] = positions[used]
+
+            if self.double_buffer is not None and len(self.double_buffer) == count:
+                mesh.double_buffer = self.double_buffer[used]
+
+        else:
+            mesh.vertices = [self.vertices[vertex].copy for vertex in used]
+
+            for vertex, position in zip(mesh.vertices, positions[used].tolist()):
+                vertex.location[:3] = position
+
+            if len(self.doubles) == count:
+                mesh.doubles = [self.doubles[vertex].copy for vertex in used]
+
+        if len(self.influences) == count:
+            mesh.influences = [self.influences[vertex] for vertex in used]
+
+        return mesh
 
     @property
     def size(self):
@@ -743,11 +1499,30 @@ class Mesh:
         if self.type == 1:
             self.parser.info.triangle += 1
 
-        if self.type == 2:
-            self.parser.info.skinned += 1
+        if self.type == 2:
+            self.parser.info.skinned += 1
+
+        if self.type == 4:
+            self.parser.info.static += 1
+
+        if self.columnar:
+            for name in self.vertex_buffer.dtype.names:
+                size = self.vertex_buffer.dtype.fields[name][0].itemsize
+                self.headers[VERTEX_HEADERS[name]] = size
+
+            if self.influences:
+                self.headers[22] = -1
+                self.type = 2
+
+            self.header_count = len(self.headers)
+            self.vertex_count = len(self.vertex_buffer)
+            self.indices_count = len(self.indices)
+            self.vertex_size = self.vertex_buffer.dtype.itemsize
+
+            for influence in self.influences:
+                influence.count = len(influence.items)
 
-        if self.type == 4:
-            self.parser.info.static += 1
+            return
 
         vert = self.vertices[0]
 
@@ -800,7 +1575,7 @@ class Mesh:
 class Meshes:
     def __init__(self, parser: Parser) -> None:
         self.parser: Parser = parser
-        self.items: dict = dict()
+        self.items: IndexedDict = IndexedDict()
         self.bvh_min: list = [0, 0, 0]
         self.bvh_max: list = [0, 0, 0]
 
@@ -814,16 +1589,10 @@ class Meshes:
         return iter(self.items.values())
 
     def index(self, key: str):
-        if key not in self.items:
-            return -1
-
-        return list(self.items.keys()).index(key)
+        return self.items.index(key)
 
     def by_index(self, key: int):
-        if len(self.items) <= key or key < 0:
-            return None
-
-        return list(self.items.values())[key]
+        return self.items.by_index(key)
 
     def recalculate(self):
         self.parser.info.triangle = 0
@@ -833,6 +1602,61 @@ class Meshes:
         for mesh in self.items.values():
             mesh.recalculate()
 
+    def optimize_indices(self, cache_size: int = 16) -> dict:
+        reports = dict()
+
+        for mesh in self.items.values():
+            report = mesh.optimize_indices(cache_size)
+            reports[mesh.name] = report
+
+            print(f'Optimize: "{mesh.name}" ACMR {report["before"]:.3f} -> {report["after"]:.3f}')
+
+        return reports
+
+    def generate_lods(self, ratios: list) -> dict:
+        reports = dict()
+        bases = dict()
+        meshes = list(self.items.values())
+
+        for mesh_index, mesh in enumerate(meshes):
+            group = self.parser.groups.by_index(mesh.group)
+
+            if group is None:
+                print(f'LOD: "{mesh.name}" has no group - skipped!')
+                continue
+
+            if group.name not in bases:
+                if not group.variants:
+                    for num, item in enumerate(meshes):
+                        if item.group == mesh.group:
+                            group.add_variant(0, num)
+
+                bases[group.name] = len(group.variants)
+
+            variant = group.get_variant(mesh_index)
+            reports[mesh.name] = list()
+
+            for level, ratio in enumerate(ratios, 1):
+                target = int(len(mesh.indices) * ratio)
+                lod = mesh.decimate(ratio)
+                lod.name = f'{mesh.name}_lod{level}'
+
+                self.items[lod.name] = lod
+                lod_index = self.items.index(lod.name)
+
+                if self.parser.file == 'GAM':
+                    group.nodes.append(lod_index)
+
+                group.add_variant(variant + level * bases[group.name], lod_index)
+                reports[mesh.name].append(len(lod.indices))
+
+                print(f'LOD: "{lod.name}" {len(mesh.indices)} -> {len(lod.indices)} triangles')
+
+                if len(lod.indices) > target:
+                    print(f'LOD: "{lod.name}" stopped at {len(lod.indices)} triangles, target was {target}')
+
+        return reports
+
     @property
     def size(self):
         size = 24
@@ -845,6 +1669,9 @@ class Meshes:
             print('Cant find: "Meshes" - skipped!')
             return
 
+        if self.parser.columnar and numpy is None:
+            raise ImportError('Columnar meshes require numpy')
+
         names = {}
         if self.parser.file == 'GAM':
             for num in range(self.parser.info.meshes):
@@ -863,7 +1690,8 @@ class Meshes:
                 names[mesh.name] = names.get(mesh.name, 0)
                 if mesh.name in names:
                     names[mesh.name] += 1
-                    mesh.name = f'{mesh.name}.{names[mesh.name]:03}'
+                    if names[mesh.name] > 1:
+                        mesh.name = f'{mesh.name}.{names[mesh.name] - 1:03}'
 
                 mesh.type = stream.unpack('<i')
                 mesh.parent = stream.unpack('<i')
@@ -876,16 +1704,26 @@ class Meshes:
 
                 struct, method = GAM_DATA2VERTEX.get(mesh.vertex_type)
 
-                for data in stream.iter_unpack(struct, mesh.vertex_count):
-                    vertex = Vertex()
-                    method(vertex, data)
-                    mesh.vertices.append(vertex)
+                if self.parser.columnar:
+                    dtype = vertex_dtype(mesh.vertex_type)
+                    size = dtype.itemsize * mesh.vertex_count
+
+                    mesh.vertex_buffer = numpy.frombuffer(stream.read(size), dtype)
+
+                    if mesh.type == 1:
+                        mesh.double_buffer = numpy.frombuffer(stream.read(size), dtype)
 
-                if mesh.type == 1:
+                else:
                     for data in stream.iter_unpack(struct, mesh.vertex_count):
                         vertex = Vertex()
                         method(vertex, data)
-                        mesh.doubles.append(vertex)
+                        mesh.vertices.append(vertex)
+
+                    if mesh.type == 1:
+                        for data in stream.iter_unpack(struct, mesh.vertex_count):
+                            vertex = Vertex()
+                            method(vertex, data)
+                            mesh.doubles.append(vertex)
 
                 if mesh.type == 2:
                     for _ in range(mesh.vertex_count):
@@ -903,8 +1741,10 @@ class Meshes:
 
                         mesh.influences.append(group)
 
-                for indices in stream.iter_unpack('<3H', mesh.indices_count):
-                    mesh.indices.append(indices)
+                mesh.indices.load(stream, mesh.indices_count)
+
+                if not mesh.indices.validate(mesh.vertex_count):
+                    print(f'Mesh "{mesh.name}" has indices out of range!')
 
                 self.items[mesh.name] = mesh
 
@@ -963,8 +1803,7 @@ class Meshes:
                                 influence.node = stream.unpack('<h')
                                 influence.weight = stream.unpack('<f')
 
-                for indices in stream.iter_unpack('<3h'):
-                    mesh.indices.append(indices)
+                mesh.indices.load(stream, mesh.indices_count)
 
                 self.items[mesh.name] = mesh
 
@@ -972,6 +1811,9 @@ class Meshes:
         self.bvh_max = stream.unpack('<3f')
 
     def dump(self, stream: IOWrapper):
+        if self.parser.vertex_cache:
+            self.optimize_indices(self.parser.vertex_cache)
+
         for mesh in self.items.values():
             if self.parser.file == 'GAM':
                 stream.pack('<40s', mesh.name.encode('cp1251'))
@@ -985,13 +1827,19 @@ class Meshes:
                 stream.pack('<I', mesh.indices_count)
 
                 struct, method = GAM_VERTEX2DATA.get(mesh.vertex_type)
+                compiled = get_struct(struct)
+
+                if mesh.columnar:
+                    stream.write(mesh.vertex_buffer.tobytes())
 
-                for vertex in mesh.vertices:
-                    stream.pack(struct, *method(vertex))
+                    if mesh.type != 4 and mesh.double_buffer is not None:
+                        stream.write(mesh.double_buffer.tobytes())
 
-                if mesh.type != 4:
-                    for vertex in mesh.doubles:
-                        stream.pack(struct, *method(vertex))
+                else:
+                    stream.write(b''.join([compiled.pack(*method(vertex)) for vertex in mesh.vertices]))
+
+                    if mesh.type != 4:
+                        stream.write(b''.join([compiled.pack(*method(vertex)) for vertex in mesh.doubles]))
 
                 if mesh.type == 2:
                     for group in mesh.influences:
@@ -1003,8 +1851,7 @@ class Meshes:
                             stream.pack('<3f', *influence.offset)
                             stream.pack('<3f', *influence.normal)
 
-                for indices in mesh.indices:
-                    stream.pack('<3H', *indices)
+                mesh.indices.dump(stream)
 
             if self.parser.file == 'SAM':
                 stream.pack('<I', mesh.type)
@@ -1054,8 +1901,7 @@ class Meshes:
                                     stream.pack('<h', influence.node)
                                     stream.pack('<f', influence.weight)
 
-                for indices in mesh.indices:
-                    stream.pack('<3H', *indices)
+                mesh.indices.dump(stream)
 
         stream.pack('<3f', *self.bvh_min)
         stream.pack('<3f', *self.bvh_max)
@@ -1067,6 +1913,17 @@ class Key:
     rotation: list = [0, 0, 0]
     scale: list = [1, 1, 1]
 
+    @property
+    def copy(self):
+        key = Key()
+
+        key.node = self.node
+        key.location = list(self.location)
+        key.rotation = list(self.rotation)
+        key.scale = list(self.scale)
+
+        return key
+
 
 class Change:
     type: int = 0
@@ -1085,66 +1942,413 @@ class Animation:
     action: int = 0
     changes: list = list()
     frames: list = list()
+    nodes: numpy.ndarray = None
+    locations: numpy.ndarray = None
+    rotations: numpy.ndarray = None
+    scales: numpy.ndarray = None
 
     def __init__(self, parser: Parser):
         self.parser = parser
         self.changes = list()
         self.frames = list()
+        self.nodes = None
+        self.locations = None
+        self.rotations = None
+        self.scales = None
+
+    @property
+    def columnar(self):
+        return self.locations is not None
+
+    def load_track(self, stream: IOWrapper):
+        dtype = key_dtype(self.parser.file)
+        size = dtype.itemsize * self.frame_count * self.key_count
+
+        track = numpy.frombuffer(stream.read(size), dtype).reshape(self.frame_count, self.key_count)
+
+        if 'node' not in dtype.names:
+            self.nodes = numpy.arange(self.key_count, dtype='<i2')
+
+        elif not len(track) or (track['node'] == track['node'][0]).all():
+            self.nodes = track['node'][0].copy() if len(track) else numpy.zeros(0, dtype='<i2')
+
+        else:
+            order = numpy.argsort(track['node'], axis=1, kind='stable')
+            nodes = numpy.take_along_axis(track['node'], order, axis=1)
+
+            if (nodes != nodes[0]).any():
+                raise ValueError(f'Animation "{self.name}" frames use different node sets')
+
+            first = numpy.argsort(numpy.argsort(track['node'][0], kind='stable'), kind='stable')
+            track = numpy.take_along_axis(track, order[:, first], axis=1)
+            self.nodes = track['node'][0].copy()
+
+        self.locations = numpy.ascontiguousarray(track['location'], dtype='<f4')
+        self.rotations = numpy.ascontiguousarray(track['rotation'], dtype='<f4')
+        self.scales = numpy.ascontiguousarray(track['scale'], dtype='<f4') if 'scale' in dtype.names else None
+
+    def pack_track(self) -> bytes:
+        track = numpy.empty(self.locations.shape[:2], key_dtype(self.parser.file))
+
+        if 'node' in track.dtype.names:
+            track['node'] = self.nodes
+
+        track['location'] = self.locations
+        track['rotation'] = self.rotations
+
+        if 'scale' in track.dtype.names:
+            track['scale'] = 1.0 if self.scales is None else self.scales
+
+        return track.tobytes()
+
+    def get_keys(self, frame) -> list:
+        return list(frame.values()) if isinstance(frame, dict) else list(frame)
+
+    @property
+    def copy(self):
+        animation = Animation(self.parser)
+
+        animation.name = self.name
+        animation.frame_count = self.frame_count
+        animation.change_count = self.change_count
+        animation.key_count = self.key_count
+        animation.fps = self.fps
+        animation.next = self.next
+        animation.action = self.action
+        animation.changes = list(self.changes)
+
+        if self.columnar:
+            animation.nodes = self.nodes.copy()
+            animation.locations = self.locations.copy()
+            animation.rotations = self.rotations.copy()
+            animation.scales = None if self.scales is None else self.scales.copy()
+
+        for frame in self.frames:
+            if isinstance(frame, dict):
+                animation.frames.append({node: key.copy for node, key in frame.items()})
+            else:
+                animation.frames.append([key.copy for key in frame])
+
+        return animation
+
+    def optimize(self, tolerance: float = 0.001, angle: float = None, max_step: int = 8, drop_static: bool = False) -> int:
+        if numpy is None:
+            raise ImportError('Animation optimization requires numpy')
+
+        angle = tolerance if angle is None else angle
+
+        if self.columnar:
+            locations = self.locations.astype('<f8')
+            rotations = self.rotations.astype('<f8')
+            nodes = self.nodes
+
+        else:
+            frames = [self.get_keys(frame) for frame in self.frames]
+
+            if not frames or not frames[0]:
+                return 0
+
+            nodes = numpy.array([key.node for key in frames[0]])
+            order = [{key.node: key for key in keys} for keys in frames]
+            keys = [[frame[node] for node in nodes] for frame in order]
+
+            locations = numpy.array([[key.location for key in frame] for frame in keys], dtype='<f8')
+            rotations = numpy.array([[key.rotation for key in frame] for frame in keys], dtype='<f8')
+
+        count = len(locations)
+        self.frame_count, self.key_count = locations.shape[:2]
+
+        before = self.size
+        step = 1
+
+        if not self.changes:
+            for candidate in range(min(max_step, count - 1), 1, -1):
+                if (count - 1) % candidate or self.fps % candidate:
+                    continue
+
+                kept_locations = locations[::candidate]
+                kept_rotations = rotations[::candidate]
+                valid = True
+
+                for num in range(1, candidate):
+                    t = num / candidate
+
+                    location = kept_locations[:-1] + (kept_locations[1:] - kept_locations[:-1]) * t
+                    rotation = slerp(kept_rotations[:-1], kept_rotations[1:], t)
+
+                    if numpy.abs(location - locations[num::candidate][:len(location)]).max() > tolerance:
+                        valid = False
+                        break
+
+                    if angle_between(rotation, rotations[num::candidate][:len(rotation)]).max() > angle:
+                        valid = False
+                        break
+
+                if valid:
+                    step = candidate
+                    break
+
+        keep = numpy.ones(len(nodes), dtype=bool)
+
+        if drop_static and self.parser.file == 'GAM':
+            for num, node in enumerate(nodes):
+                item = self.parser.nodes.by_index(int(node))
+
+                if item is None:
+                    continue
+
+                if numpy.abs(locations[:, num] - numpy.asarray(item.location)).max() > tolerance:
+                    continue
+
+                if angle_between(rotations[:, num], numpy.asarray(item.rotation, dtype='<f8')).max() > angle:
+                    continue
+
+                keep[num] = False
+
+        if self.columnar:
+            self.nodes = self.nodes[keep]
+            self.locations = numpy.ascontiguousarray(self.locations[::step][:, keep])
+            self.rotations = numpy.ascontiguousarray(self.rotations[::step][:, keep])
+
+            if self.scales is not None:
+                self.scales = numpy.ascontiguousarray(self.scales[::step][:, keep])
+
+            self.frame_count, self.key_count = self.locations.shape[:2]
+
+        else:
+            self.frames = [
+                {int(node): frame[node] for node in nodes[keep]}
+                for frame in order[::step]
+            ]
+            self.frame_count = len(self.frames)
+            self.key_count = int(keep.sum())
+
+        self.fps //= step
+
+        return before - self.size
+
+    def quantize(self, bits: int = 16) -> dict:
+        if numpy is None:
+            raise ImportError('Animation quantization requires numpy')
+
+        if self.columnar:
+            locations = self.locations.astype('<f8')
+            rotations = self.rotations.astype('<f8')
+
+        else:
+            frames = [self.get_keys(frame) for frame in self.frames]
+            locations = numpy.array([[key.location for key in keys] for keys in frames], dtype='<f8')
+            rotations = numpy.array([[key.rotation for key in keys] for keys in frames], dtype='<f8')
+
+        packed, low, high = encode_locations(locations, bits)
+        new_locations = decode_locations(packed, low, high, bits)
+        new_rotations = decode_rotations(encode_rotations(rotations))
+
+        if self.columnar:
+            self.locations[...] = new_locations
+            self.rotations[...] = new_rotations
+
+        else:
+            for keys, key_locations, key_rotations in zip(frames, new_locations, new_rotations):
+                for key, location, rotation in zip(keys, key_locations, key_rotations):
+                    key.location = location.tolist()
+                    key.rotation = rotation.tolist()
+
+        count = locations.size // 3
+
+        return dict(
+            location_error=float(numpy.abs(new_locations - locations).max()) if count else 0.0,
+            angle_error=float(angle_between(new_rotations, rotations).max()) if count else 0.0,
+            raw_bytes=count * 28,
+            packed_bytes=count * (packed.itemsize * 3 + 4) + 48,
+        )
 
     @property
     def size(self):
+        frames = len(self.locations) if self.columnar else len(self.frames)
+
         if self.parser.file == 'GAM':
             size = 39 + len(self.changes) * 8
-            
-            for frame in self.frames:
-                size += self.key_count * 30
+            size += frames * self.key_count * 30
 
             return size
 
         if self.parser.file == 'SAM':
             size = 41 + len(self.changes) * 8
-            
-            for frame in self.frames:
-                size += self.key_count * 40
+            size += frames * self.key_count * 40
 
             return size
 
 class Animations:
     def __init__(self, parser: Parser) -> None:
         self.parser: Parser = parser
-        self.items: dict = dict()
+        self.items: IndexedDict = IndexedDict()
+        self.offsets: dict = dict()
 
     def __getitem__(self, key: str):
+        if key in self.offsets:
+            return self.decode(key)
+
         return self.items.get(key, None)
 
     def __setitem__(self, key: str, value: Animation):
+        self.offsets.pop(key, None)
         self.items[key] = value
 
     def __contains__(self, key: str):
         return key in self.items
 
     def __iter__(self):
-        return iter(self.items.values())
+        return (self[key] for key in list(self.items.keys()))
 
     def index(self, key: str):
-        if key not in self.items:
-            return -1
-
-        return list(self.items.keys()).index(key)
+        return self.items.index(key)
 
     def by_index(self, key: int):
         if len(self.items) <= key or key < 0:
             return None
 
-        return list(self.items.values())[key]
+        return self[self.items.order[key]]
+
+    def decode(self, key: str) -> Animation:
+        if self.parser.source is None:
+            raise ValueError(f'Animation "{key}" was not loaded before the parser was closed')
+
+        offset, num = self.offsets.pop(key)
+        self.parser.source.offset = offset
+
+        animation = self.load_animation(self.parser.source, num)
+        self.items[key] = animation
+
+        return animation
 
     def recalculate(self):
         self.parser.info.animations = len(self.items)
-        for animation in self.items.values():
-            animation.frame_count = len(animation.frames)
+        for animation in self:
             animation.change_count = len(animation.changes)
+
+            if animation.columnar:
+                animation.frame_count, animation.key_count = animation.locations.shape[:2]
+                continue
+
+            animation.frame_count = len(animation.frames)
             animation.key_count = len(animation.frames[0])
 
+    def optimize(self, tolerance: float = 0.001, angle: float = None, max_step: int = 8, drop_static: bool = False) -> int:
+        saved = 0
+
+        for animation in self:
+            result = animation.optimize(tolerance, angle, max_step, drop_static)
+            saved += result
+
+            print(f'Optimize: "{animation.name}" {animation.size + result} -> {animation.size} bytes')
+
+        return saved
+
+    def quantize(self, bits: int = 16) -> dict:
+        reports = dict()
+
+        for animation in self:
+            report = animation.quantize(bits)
+            reports[animation.name] = report
+
+            print(
+                f'Quantize: "{animation.name}" {report["raw_bytes"]} -> {report["packed_bytes"]} bytes, '
+                f'max error {report["location_error"]:.6f} units, {math.degrees(report["angle_error"]):.4f} deg'
+            )
+
+        return reports
+
+    def quantized(self, animation: Animation, bits: int, tolerance: float = 0.001, angle: float = 0.005) -> Animation:
+        result = animation.copy
+        report = result.quantize(bits)
+
+        if report['location_error'] > tolerance or report['angle_error'] > angle:
+            print(
+                f'Quantize: "{animation.name}" rejected, max error {report["location_error"]:.6f} units, '
+                f'{math.degrees(report["angle_error"]):.4f} deg - written as is'
+            )
+            return animation
+
+        print(
+            f'Quantize: "{animation.name}" max error {report["location_error"]:.6f} units, '
+            f'{math.degrees(report["angle_error"]):.4f} deg'
+        )
+
+        return result
+
+    def dump_packed(self, stream: IOWrapper, bits: int = 16):
+        if numpy is None:
+            raise ImportError('Packed animations require numpy')
+
+        animations = list(self)
+
+        stream.write(PACKED_MAGIC)
+        stream.pack('<I', len(animations))
+
+        for animation in animations:
+            if animation.columnar:
+                nodes, locations, rotations, scales = animation.nodes, animation.locations, animation.rotations, animation.scales
+
+            else:
+                frames = [animation.get_keys(frame) for frame in animation.frames]
+                nodes = numpy.array([key.node for key in frames[0]] if frames else [], dtype='<i2')
+                locations = numpy.array([[key.location for key in keys] for keys in frames], dtype='<f4').reshape(len(frames), len(nodes), 3)
+                rotations = numpy.array([[key.rotation for key in keys] for keys in frames], dtype='<f4').reshape(len(frames), len(nodes), 4)
+                scales = None
+
+                if self.parser.file == 'SAM':
+                    scales = numpy.array([[key.scale for key in keys] for keys in frames], dtype='<f4').reshape(len(frames), len(nodes), 3)
+
+            packed, low, high = encode_locations(locations, bits)
+
+            stream.pack('<25s', animation.name.encode('cp1251'))
+            stream.pack('<5I', len(locations), len(nodes), animation.fps, bits, scales is not None)
+            stream.pack('<6f', *low, *high)
+            stream.write(numpy.asarray(nodes, dtype='<i2').tobytes())
+            stream.write(packed.tobytes())
+            stream.write(encode_rotations(rotations).astype('<u4').tobytes())
+
+            if scales is not None:
+                stream.write(numpy.asarray(scales, dtype='<f4').tobytes())
+
+    def load_packed(self, stream: IOWrapper):
+        if numpy is None:
+            raise ImportError('Packed animations require numpy')
+
+        if stream.read(len(PACKED_MAGIC)) != PACKED_MAGIC:
+            raise ValueError('Not a packed animation file')
+
+        for _ in range(stream.unpack('<I')):
+            name = decode_name(stream.unpack('<25s'))
+            frame_count, key_count, fps, bits, scaled = stream.unpack('<5I')
+            bounds = numpy.array(stream.unpack('<6f'), dtype='<f8')
+            count = frame_count * key_count
+
+            dtype = numpy.dtype('<u2' if bits <= 16 else '<u4')
+
+            nodes = numpy.frombuffer(stream.read(key_count * 2), '<i2').copy()
+            packed = numpy.frombuffer(stream.read(count * 3 * dtype.itemsize), dtype).reshape(frame_count, key_count, 3)
+            rotations = numpy.frombuffer(stream.read(count * 4), '<u4').reshape(frame_count, key_count)
+
+            animation = self[name]
+
+            if animation is None:
+                animation = Animation(self.parser)
+                animation.name = name
+                self[name] = animation
+
+            animation.frames = list()
+            animation.fps = fps
+            animation.frame_count, animation.key_count = frame_count, key_count
+            animation.nodes = nodes
+            animation.locations = decode_locations(packed, bounds[:3], bounds[3:], bits).astype('<f4')
+            animation.rotations = decode_rotations(rotations).astype('<f4')
+            animation.scales = None
+
+            if scaled:
+                animation.scales = numpy.frombuffer(stream.read(count * 12), '<f4').reshape(frame_count, key_count, 3).copy()
+
     @property
     def used(self):
         return bool(self.items)
@@ -1163,36 +2367,58 @@ class Animations:
             print('Cant find: "Animations" - skipped!')
             return
 
+        if self.parser.columnar and numpy is None:
+            raise ImportError('Columnar animations require numpy')
+
         count = self.parser.info.animations
         for num in range(count):
-            if self.parser.file == 'GAM':
-                animation: Animation = Animation(self.parser)
+            offset = stream.offset
+            animation = self.load_animation(stream, num, self.parser.source is not None)
+
+            if self.parser.source is not None:
+                self.offsets[animation.name] = (offset, num)
+                self.items[animation.name] = None
+                continue
+
+            self.items[animation.name] = animation
+
+    def load_animation(self, stream: IOWrapper, num: int, skip: bool = False) -> Animation:
+        if self.parser.file == 'GAM':
+            animation: Animation = Animation(self.parser)
+
+            animation.name = stream.unpack('<25s')
 
-                animation.name = stream.unpack('<25s')
+            if b'\x00' in animation.name:
+                animation.name = animation.name[:animation.name.index(b'\x00')]
 
-                if b'\x00' in animation.name:
-                    animation.name = animation.name[:animation.name.index(b'\x00')]
+            animation.name = animation.name.decode('cp1251')
 
-                animation.name = animation.name.decode('cp1251')
+            if not animation.name:
+                animation.name = f'Animation.{num:0>3}'
 
-                if not animation.name:
-                    animation.name = f'Animation.{num:0>3}'
+            animation.frame_count = stream.unpack('<H')
+            animation.fps = stream.unpack('<H')
+            animation.next = stream.unpack('<h')
+            animation.change_count = stream.unpack('<H')
+            animation.key_count = stream.unpack('<H')
+            animation.action = stream.unpack('<i')
 
-                animation.frame_count = stream.unpack('<H')
-                animation.fps = stream.unpack('<H')
-                animation.next = stream.unpack('<h')
-                animation.change_count = stream.unpack('<H')
-                animation.key_count = stream.unpack('<H')
-                animation.action = stream.unpack('<i')
-                
-                for _ in range(animation.change_count):
-                    change: Change = Change()
-                    change.current = stream.unpack('<h')
-                    change.type = stream.unpack('<I')
-                    change.new = stream.unpack('<h')
+            if skip:
+                stream.offset += animation.change_count * 8 + animation.frame_count * animation.key_count * 30
+                return animation
 
-                    animation.changes.append(change)
+            for _ in range(animation.change_count):
+                change: Change = Change()
+                change.current = stream.unpack('<h')
+                change.type = stream.unpack('<I')
+                change.new = stream.unpack('<h')
 
+                animation.changes.append(change)
+
+            if self.parser.columnar:
+                animation.load_track(stream)
+
+            else:
                 for _ in range(animation.frame_count):
                     keys = dict()
 
@@ -1206,35 +2432,43 @@ class Animations:
 
                     animation.frames.append(keys)
 
-                self.items[animation.name] = animation
+            return animation
 
-            if self.parser.file == 'SAM':
-                animation: Animation = Animation(self.parser)
+        if self.parser.file == 'SAM':
+            animation: Animation = Animation(self.parser)
 
-                animation.name = stream.unpack('<25s')
+            animation.name = stream.unpack('<25s')
 
-                if b'\x00' in animation.name:
-                    animation.name = animation.name[:animation.name.index(b'\x00')]
+            if b'\x00' in animation.name:
+                animation.name = animation.name[:animation.name.index(b'\x00')]
 
-                animation.name = animation.name.decode('cp1251')
+            animation.name = animation.name.decode('cp1251')
 
-                if not animation.name:
-                    animation.name = f'Animation.{num:0>3}'
+            if not animation.name:
+                animation.name = f'Animation.{num:0>3}'
 
-                animation.frame_count = stream.unpack('<I')
-                animation.fps = stream.unpack('<I')
-                animation.next = stream.unpack('<i')
-                animation.change_count = stream.unpack('<I')
-                animation.key_count = self.parser.info.nodes
+            animation.frame_count = stream.unpack('<I')
+            animation.fps = stream.unpack('<I')
+            animation.next = stream.unpack('<i')
+            animation.change_count = stream.unpack('<I')
+            animation.key_count = self.parser.info.nodes
 
-                for _ in range(animation.change_count):
-                    change: Change = Change()
-                    change.type = stream.unpack('<I')
-                    change.current = stream.unpack('<h')
-                    change.new = stream.unpack('<h')
+            if skip:
+                stream.offset += animation.change_count * 8 + animation.frame_count * animation.key_count * 40
+                return animation
 
-                    animation.changes.append(change)
+            for _ in range(animation.change_count):
+                change: Change = Change()
+                change.type = stream.unpack('<I')
+                change.current = stream.unpack('<h')
+                change.new = stream.unpack('<h')
 
+                animation.changes.append(change)
+
+            if self.parser.columnar:
+                animation.load_track(stream)
+
+            else:
                 for _ in range(animation.frame_count):
                     keys = dict()
 
@@ -1248,10 +2482,19 @@ class Animations:
                         keys[key.node] = key
 
                     animation.frames = keys
-                self.items[animation.name] = animation
+
+            return animation
 
     def dump(self, stream: IOWrapper):
-        for animation in self.items.values():
+        animations = list(self.items.values())
+
+        if self.parser.quantize:
+            animations = [
+                self.quantized(animation, self.parser.quantize, self.parser.quantize_tolerance, self.parser.quantize_angle)
+                for animation in animations
+            ]
+
+        for animation in animations:
             if self.parser.file == 'GAM':
                 stream.pack('<25s', animation.name.encode('cp1251'))
                 stream.pack('<H', animation.frame_count)
@@ -1266,14 +2509,19 @@ class Animations:
                     stream.pack('<I', change.type)
                     stream.pack('<h', change.new)
 
+                if animation.columnar:
+                    stream.write(animation.pack_track())
+
                 for frame in animation.frames:
-                    for key in frame:
+                    keys = frame.values() if isinstance(frame, dict) else frame
+
+                    for key in keys:
                         stream.pack('<h', key.node)
                         stream.pack('<3f', *key.location)
                         stream.pack('<4f', *key.rotation)
 
             if self.parser.file == 'SAM':
-                stream.pack('<25s', animation.name.enncode('cp1251'))
+                stream.pack('<25s', animation.name.encode('cp1251'))
                 stream.pack('<I', animation.frame_count)
                 stream.pack('<I', animation.fps)
                 stream.pack('<i', animation.next)
@@ -1284,8 +2532,11 @@ class Animations:
                     stream.pack('<h', change.current)
                     stream.pack('<h', change.new)
 
+                if animation.columnar:
+                    stream.write(animation.pack_track())
+
                 for frame in animation.frames:
-                    for num in animation.key_count:
+                    for num in range(animation.key_count):
                         key = frame.get(num, Key)
                         stream.pack('<3f', *key.location)
                         stream.pack('<4f', *key.rotation)
@@ -1328,7 +2579,7 @@ class Material:
 class Skins:
     def __init__(self, parser: Parser) -> None:
         self.parser: Parser = parser
-        self.items: dict = dict()
+        self.items: IndexedDict = IndexedDict()
 
     def __getitem__(self, key: str):
         return self.items.get(key, None)
@@ -1340,13 +2591,10 @@ class Skins:
         return iter(self.items.values())
 
     def index(self, key: str):
-        if key not in self.items:
-            return -1
-
-        return list(self.items.keys()).index(key)
+        return self.items.index(key)
 
     def by_index(self, skin: str, key: int) -> Material:
-        return list(self.items[skin].values())[key]
+        return self.items[skin].by_index(key)
 
     def recalculate(self):
         self.parser.info.materials = len(self.items[0])
@@ -1372,7 +2620,7 @@ class Skins:
 
         count = stream.unpack('<I')
         for skin_num in range(count):
-            skin = dict()
+            skin = IndexedDict()
             for num in range(self.parser.info.materials):
                 material: Material = Material(self.parser)
                 name = self.parser.model_name or 'Material'
@@ -1420,7 +2668,7 @@ class Skins:
 
     def set_skin(self, num: int, material: Material):
         if num not in self.items:
-            self.items[num] = dict()
+            self.items[num] = IndexedDict()
 
         if material.name in self.items[num]:
             return
@@ -1458,7 +2706,7 @@ class Convex:
         self.verticles_count: int = 0
         self.indices_count: int = 0
         self.vertices: list = list()
-        self.indices: list = list()
+        self.indices: Indices = Indices()
 
     def recalculate(self):
         self.verticles_count = len(self.vertices)
@@ -1483,8 +2731,10 @@ class Convex:
         for vert in stream.iter_unpack('<3f', self.verticles_count):
             self.vertices.append(vert)
 
-        for indices in stream.iter_unpack('<3h', self.indices_count):
-            self.indices.append(indices)
+        self.indices.load(stream, self.indices_count)
+
+        if not self.indices.validate(self.verticles_count):
+            print('Convex has indices out of range!')
 
     def dump(self, stream: IOWrapper):
         if not self.parser.headers.has('CONVEX'):
@@ -1496,8 +2746,7 @@ class Convex:
         for vert in self.vertices:
             stream.pack('<3f', *vert)
 
-        for indices in self.indices:
-            stream.pack('<3H', *indices)
+        self.indices.dump(stream)
 
 
 class Collision:
@@ -1593,10 +2842,10 @@ class HierGeoms:
     @property
     def size(self):
         if self.parser.mode == 'HTA':
-            return len(self.items) * 48
+            return 4 + len(self.items) * 48
 
         if self.parser.mode == '113':
-            return len(self.items) * 52
+            return 4 + len(self.items) * 52
 
     def load(self, stream: IOWrapper):
         if not self.parser.headers.set_tag('HIER_GEOM', stream):
@@ -1732,7 +2981,7 @@ class Group:
 class Groups:
     def __init__(self, parser: Parser) -> None:
         self.parser: Parser = parser
-        self.items: dict = dict()
+        self.items: IndexedDict = IndexedDict()
 
     def __getitem__(self, key: str):
         return self.items.get(key, None)
@@ -1744,16 +2993,10 @@ class Groups:
         return iter(self.items.values())
 
     def index(self, key: str):
-        if key not in self.items:
-            return -1
-
-        return list(self.items.keys()).index(key)
+        return self.items.index(key)
 
     def by_index(self, key: int):
-        if len(self.items) <= key or key < 0:
-            return None
-
-        return list(self.items.values())[key]
+        return self.items.by_index(key)
 
     @property
     def size(self):
@@ -1805,6 +3048,9 @@ class Groups:
                 if not isinstance(variant, list):
                     variant = [variant, ]
 
+                if self.parser.file == 'GAM':
+                    variant = [group.nodes[uid] for uid in variant]
+
                 group.variants[num] = variant
 
             self.items[group.name] = group
@@ -1875,12 +3121,55 @@ class Sign:
         stream.pack('<64s', self.value.encode('cp1251'))
 
 
+DUMP_SECTIONS = (
+    ('INFO',        'info'),
+    ('NODES',       'nodes'),
+    ('MESHES',      'meshes'),
+    ('ANIMATIONS',  'animations'),
+    ('MATERIALS',   'skins'),
+    ('CONVEX',      'convex'),
+    ('COLLISIONS',  'collisions'),
+    ('HIER_GEOM',   'hier_geoms'),
+    ('BOUNDS',      'bounds'),
+    ('GROUPS',      'groups'),
+    ('TAG',         'version'),
+    ('PARSER',      'generator'),
+    ('SIGN',        'sign'),
+)
+
+PACKED_MAGIC = b'HTAQ\x01\x00\x00\x00'
+
+DUMP_SPANS = {
+    'TAG': ('TAG', 'VERSION'),
+}
+
+LAZY_SECTIONS = (
+    'nodes',
+    'meshes',
+    'animations',
+    'skins',
+    'convex',
+    'collisions',
+    'hier_geoms',
+    'bounds',
+    'groups',
+    'sign',
+)
+
+
 class Parser:
     def __init__(self) -> None:
         self.mode = 'HTA'
         self.file = 'GAM'
         self.model_name = None
         self.t2m_name = False
+        self.columnar = False
+        self.quantize = 0
+        self.quantize_tolerance = 0.001
+        self.quantize_angle = 0.005
+        self.vertex_cache = 0
+        self.source = None
+        self.pending = dict()
 
         self.headers = Headers(self)
         self.info = Info(self)
@@ -1897,20 +3186,60 @@ class Parser:
         self.generator = Generator(self)
         self.sign = Sign(self)
 
+    def __getattr__(self, name: str):
+        pending = self.__dict__.get('pending')
+
+        if not pending or name not in pending:
+            raise AttributeError(f'{type(self).__name__!r} object has no attribute {name!r}')
+
+        if self.source is None:
+            raise ValueError(f'Section "{name}" was not loaded before the parser was closed')
+
+        section = pending.pop(name)
+        setattr(self, name, section)
+        section.load(self.source)
+
+        return section
+
     def load(self, stream: io.FileIO):
         with IOWrapper(stream) as target:
-            self.headers.load(target)
-            self.info.load(target)
-            self.nodes.load(target)
-            self.meshes.load(target)
-            self.animations.load(target)
-            self.skins.load(target)
-            self.convex.load(target)
-            self.collisions.load(target)
-            self.hier_geoms.load(target)
-            self.bounds.load(target)
-            self.groups.load(target)
-            self.sign.load(target)
+            self.load_sections(target)
+
+    def load_mmap(self, path: str, lazy: bool = False):
+        with open(path, 'rb') as stream:
+            buffer = mmap.mmap(stream.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if not lazy:
+            with buffer, BufferWrapper(buffer) as target:
+                self.load_sections(target)
+
+            return
+
+        self.source = BufferWrapper(buffer)
+        self.headers.load(self.source)
+        self.info.load(self.source)
+
+        for name in LAZY_SECTIONS:
+            self.pending[name] = self.__dict__.pop(name)
+
+    def close(self):
+        if self.source:
+            self.source.close()
+            self.source = None
+
+    def load_sections(self, target: IOWrapper):
+        self.headers.load(target)
+        self.info.load(target)
+        self.nodes.load(target)
+        self.meshes.load(target)
+        self.animations.load(target)
+        self.skins.load(target)
+        self.convex.load(target)
+        self.collisions.load(target)
+        self.hier_geoms.load(target)
+        self.bounds.load(target)
+        self.groups.load(target)
+        self.sign.load(target)
 
     def dump(self, stream: io.FileIO):
         self.nodes.recalculate()
@@ -1924,18 +3253,217 @@ class Parser:
         self.groups.recalculate()
         self.headers.recalculate()
 
-        with IOWrapper(stream) as target:
+        buffer = bytearray(self.headers.size)
+
+        with BufferWrapper(buffer) as target:
             self.headers.dump(target)
-            self.info.dump(target)
-            self.nodes.dump(target)
-            self.meshes.dump(target)
-            self.animations.dump(target)
-            self.skins.dump(target)
-            self.convex.dump(target)
-            self.collisions.dump(target)
-            self.hier_geoms.dump(target)
-            self.bounds.dump(target)
-            self.groups.dump(target)
-            self.version.dump(target)
-            self.generator.dump(target)
-            self.sign.dump(target)
+
+            for tag, name in DUMP_SECTIONS:
+                if self.headers.set_tag(tag, target):
+                    getattr(self, name).dump(target)
+
+                    offset = self.headers.items[self.headers.get_tag(tag)].offset
+                    size = sum(self.headers.items[self.headers.get_tag(name)].size for name in DUMP_SPANS.get(tag, (tag,)))
+
+                    if target.offset != offset + size:
+                        raise ValueError(f'Section "{tag}" wrote {target.offset - offset} bytes, expected {size}')
+
+        stream.write(buffer)
+
+
+def decode_name(value: bytes) -> str:
+    if b'\x00' in value:
+        value = value[:value.index(b'\x00')]
+
+    return value.decode('cp1251')
+
+
+def probe(path: str) -> dict:
+    file = pathlib.Path(path).suffix[1:].upper()
+
+    if file not in ('GAM', 'SAM'):
+        raise ValueError(f'Unknown model file: "{path}"')
+
+    column = 0 if file == 'GAM' else 1
+    result = dict(path=str(path), file=file)
+
+    with open(path, 'rb') as stream, IOWrapper(stream) as target:
+        result['bom'] = target.read(8).hex()
+
+        count = target.unpack('<I')
+        headers = {tag: offset for tag, _, offset in target.iter_unpack('<IIQ', count)}
+
+        result['sections'] = [name for name, tags in TAG_MAP.items() if tags[column] in headers]
+
+        tag = TAG_MAP['INFO'][column]
+        if tag in headers:
+            target.offset = headers[tag]
+
+            if file == 'GAM':
+                info = target.unpack('<6hi')
+                keys = ('triangle', 'skinned', 'static', 'animations', 'materials', 'nodes', 'config')
+
+            if file == 'SAM':
+                info = target.unpack('<4I')
+                keys = ('triangle', 'materials', 'nodes', 'config')
+
+            result.update(zip(keys, info))
+
+        tag = TAG_MAP['SIGN'][column]
+        if tag in headers:
+            target.offset = headers[tag]
+            result['sign'] = decode_name(target.unpack('<64s'))
+
+    return result
+
+
+def iter_models(paths: list):
+    for path in paths:
+        if not os.path.isdir(path):
+            yield path
+            continue
+
+        for root, _, files in os.walk(path):
+            for name in sorted(files):
+                if name[-4:].lower() in ('.gam', '.sam'):
+                    yield os.path.join(root, name)
+
+
+def run_probe(args: argparse.Namespace):
+    for path in iter_models(args.paths):
+        try:
+            result = probe(path)
+
+        except (OSError, ValueError, struct.error) as error:
+            result = dict(path=path, error=str(error))
+
+        print(json.dumps(result, ensure_ascii=False), flush=True)
+
+
+def convert(
+    path: str, target: str = None, mode: str = 'HTA', target_mode: str = None, sign: str = None,
+    lods: list = None, quantize: int = 0, tolerance: float = 0.001,
+) -> dict:
+    result = dict(path=path, target=target)
+    start = time.perf_counter()
+    log = io.StringIO()
+
+    try:
+        with contextlib.redirect_stdout(log):
+            provider = Parser()
+            provider.file = pathlib.Path(path).suffix[1:].upper()
+            provider.mode = mode
+            provider.load_mmap(path)
+
+            provider.mode = target_mode or mode
+
+            if sign is not None:
+                provider.sign.value = sign
+
+            if lods:
+                provider.meshes.generate_lods(lods)
+
+            provider.quantize = quantize
+            provider.quantize_tolerance = tolerance
+
+            if target:
+                os.makedirs(os.path.dirname(target) or '.', exist_ok=True)
+
+                with open(target, 'wb') as stream:
+                    provider.dump(stream)
+                    result['bytes_out'] = stream.tell()
+
+                if quantize and len(provider.animations.items):
+                    with open(target + '.htaq', 'wb') as stream:
+                        provider.animations.dump_packed(IOWrapper(stream), quantize)
+                        result['packed_bytes'] = stream.tell()
+
+            else:
+                stream = io.BytesIO()
+                provider.dump(stream)
+                result['bytes_out'] = stream.tell()
+
+        result['bytes_in'] = os.path.getsize(path)
+
+    except Exception as error:
+        result['error'] = f'{type(error).__name__}: {error}'
+
+    result['time'] = round(time.perf_counter() - start, 4)
+    result['log'] = log.getvalue().splitlines()
+
+    return result
+
+
+def run_batch(args: argparse.Namespace):
+    jobs = list()
+
+    for root in args.paths:
+        for path in iter_models([root]):
+            target = None
+
+            if args.output:
+                name = os.path.relpath(path, root) if os.path.isdir(root) else os.path.basename(path)
+                target = os.path.join(args.output, name)
+
+            jobs.append((path, target))
+
+    start = time.perf_counter()
+    failures = 0
+    total = 0
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=args.workers) as executor:
+        futures = [
+            executor.submit(
+                convert, path, target, args.mode, args.target_mode, args.sign,
+                args.lod, args.quantize, args.quantize_tolerance,
+            )
+            for path, target in jobs
+        ]
+
+        for future in concurrent.futures.as_completed(futures):
+            result = future.result()
+
+            if 'error' in result:
+                failures += 1
+
+            total += result.get('bytes_in', 0)
+            print(json.dumps(result, ensure_ascii=False), flush=True)
+
+    summary = dict(
+        files=len(jobs),
+        failures=failures,
+        bytes=total,
+        time=round(time.perf_counter() - start, 4),
+    )
+    print(json.dumps(dict(summary=summary)), flush=True)
+
+    if failures:
+        sys.exit(1)
+
+
+def main(argv: list = None):
+    parser = argparse.ArgumentParser(prog='htaparser')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    command = commands.add_parser('probe', help='print a JSON line summary for every GAM/SAM file')
+    command.add_argument('paths', nargs='+', help='model files or directories to scan')
+    command.set_defaults(handler=run_probe)
+
+    command = commands.add_parser('batch', help='load and dump every GAM/SAM file using a process pool')
+    command.add_argument('paths', nargs='+', help='model files or directories to process')
+    command.add_argument('-o', '--output', help='directory for converted files, round trip in memory if omitted')
+    command.add_argument('-j', '--workers', type=int, default=None, help='worker process count')
+    command.add_argument('--mode', default='HTA', choices=('HTA', '113'), help='game version of the source files')
+    command.add_argument('--target-mode', default=None, choices=('HTA', '113'), help='game version to write')
+    command.add_argument('--sign', default=None, help='replace the model sign')
+    command.add_argument('--lod', type=float, action='append', metavar='RATIO', help='add a decimated mesh variant at this triangle ratio, repeatable')
+    command.add_argument('--quantize', type=int, default=0, metavar='BITS', help='quantize animation locations to BITS and write a packed .htaq side-car')
+    command.add_argument('--quantize-tolerance', type=float, default=0.001, metavar='UNITS', help='keep a clip unquantized if its location error exceeds this')
+    command.set_defaults(handler=run_batch)
+
+    args = parser.parse_args(argv)
+    args.handler(args)
+
+
+if __name__ == '__main__':
+    main()
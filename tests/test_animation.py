@@ -0,0 +1,133 @@
+import io
+import math
+
+import numpy
+import pytest
+
+import htaparser
+
+
+def random_quaternions(count, seed=0):
+    quats = numpy.random.default_rng(seed).normal(size=(count, 4))
+    return quats / numpy.linalg.norm(quats, axis=1, keepdims=True)
+
+
+def build_animation(frames=12, nodes=4):
+    parser = htaparser.Parser()
+    parser.skins.set_skin(0, htaparser.Material(parser))
+
+    for node in range(nodes):
+        parser.nodes[f'node{node}'] = htaparser.Node()
+        parser.nodes[f'node{node}'].name = f'node{node}'
+
+    animation = htaparser.Animation(parser)
+    animation.name = 'run'
+    animation.fps = 30
+    quats = random_quaternions(frames * nodes).reshape(frames, nodes, 4)
+
+    for frame in range(frames):
+        keys = list()
+
+        for node in range(nodes):
+            key = htaparser.Key()
+            key.node = node
+            key.location = [frame * 0.1, node * 0.5, math.sin(frame)]
+            key.rotation = list(quats[frame, node])
+            keys.append(key)
+
+        animation.frames.append(keys)
+
+    parser.animations['run'] = animation
+
+    return parser, animation
+
+
+def test_rotations_round_trip():
+    quats = random_quaternions(1000)
+    decoded = htaparser.decode_rotations(htaparser.encode_rotations(quats))
+
+    dots = numpy.abs(numpy.sum(quats * decoded, axis=1))
+    angles = 2 * numpy.arccos(numpy.clip(dots, -1.0, 1.0))
+
+    assert decoded.shape == quats.shape
+    assert angles.max() < 0.005
+
+
+def test_rotations_keep_shape():
+    quats = random_quaternions(24).reshape(2, 3, 4, 4)
+    packed = htaparser.encode_rotations(quats)
+
+    assert packed.shape == (2, 3, 4)
+    assert htaparser.decode_rotations(packed).shape == quats.shape
+
+
+def test_rotations_axis_aligned():
+    quats = numpy.eye(4)
+    decoded = htaparser.decode_rotations(htaparser.encode_rotations(quats))
+
+    assert numpy.allclose(numpy.abs(decoded), quats)
+
+
+@pytest.mark.parametrize('bits', [8, 16, 24])
+def test_locations_round_trip(bits):
+    locations = numpy.random.default_rng(1).uniform(-50, 50, size=(10, 6, 3))
+    packed, low, high = htaparser.encode_locations(locations, bits)
+    decoded = htaparser.decode_locations(packed, low, high, bits)
+
+    step = (high - low) / (2 ** bits - 1)
+
+    assert packed.dtype == numpy.dtype('<u2' if bits <= 16 else '<u4')
+    assert numpy.all(numpy.abs(decoded - locations) <= step / 2 + 1e-9)
+
+
+def test_locations_flat_axis():
+    locations = numpy.zeros((4, 2, 3))
+    locations[..., 0] = numpy.arange(8).reshape(4, 2)
+    packed, low, high = htaparser.encode_locations(locations)
+
+    assert numpy.allclose(htaparser.decode_locations(packed, low, high), locations, atol=1e-4)
+
+
+def test_dump_keeps_source_keys():
+    parser, animation = build_animation()
+    parser.quantize = 16
+    source = [[list(key.location) for key in frame] for frame in animation.frames]
+
+    first, second = io.BytesIO(), io.BytesIO()
+    parser.dump(first)
+    parser.dump(second)
+
+    assert first.getvalue() == second.getvalue()
+    assert [[key.location for key in frame] for frame in animation.frames] == source
+
+
+def test_dump_rejects_over_tolerance():
+    parser, animation = build_animation()
+    expected = io.BytesIO()
+    parser.dump(expected)
+
+    parser.quantize = 8
+    parser.quantize_tolerance = 1e-6
+    result = io.BytesIO()
+    parser.dump(result)
+
+    assert result.getvalue() == expected.getvalue()
+
+
+def test_packed_round_trip():
+    parser, animation = build_animation()
+    stream = io.BytesIO()
+    parser.animations.dump_packed(htaparser.IOWrapper(stream), 16)
+
+    result = htaparser.Parser()
+    stream.seek(0)
+    result.animations.load_packed(htaparser.IOWrapper(stream))
+    loaded = result.animations['run']
+
+    locations = numpy.array([[key.location for key in frame] for frame in animation.frames])
+    rotations = numpy.array([[key.rotation for key in frame] for frame in animation.frames])
+
+    assert len(stream.getvalue()) < len(animation.frames) * 4 * 30
+    assert list(loaded.nodes) == [0, 1, 2, 3]
+    assert numpy.abs(loaded.locations - locations).max() < 0.001
+    assert numpy.abs(numpy.sum(loaded.rotations * rotations, axis=-1)).min() > 0.9999
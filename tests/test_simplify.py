@@ -0,0 +1,105 @@
+import math
+
+import numpy
+import pytest
+
+import htaparser
+
+
+def torus(rings=60, sides=40, flat=False):
+    positions, coords, triangles = list(), list(), list()
+
+    for ring in range(rings + 1):
+        for side in range(sides + 1):
+            theta, phi = 2 * math.pi * (ring % rings) / rings, 2 * math.pi * (side % sides) / sides
+            radius = 1.0 + 0.4 * math.cos(phi)
+            positions.append((radius * math.cos(theta), 0.4 * math.sin(phi), radius * math.sin(theta)))
+            coords.append((ring / rings, side / sides))
+
+    for ring in range(rings):
+        for side in range(sides):
+            a = ring * (sides + 1) + side
+            b, c = a + 1, a + sides + 1
+            triangles += [(a, b, c), (b, c + 1, c)]
+
+    positions, coords, triangles = numpy.array(positions), numpy.array(coords), numpy.array(triangles)
+
+    if flat:
+        positions, coords = positions[triangles.ravel()], coords[triangles.ravel()]
+        triangles = numpy.arange(len(triangles) * 3).reshape(-1, 3)
+
+    return positions, coords, triangles
+
+
+def weld(positions, triangles):
+    _, shared = numpy.unique(numpy.round(positions, 9), axis=0, return_inverse=True)
+    return shared.ravel()[triangles]
+
+
+def assert_closed_manifold(positions, triangles):
+    welded = weld(positions, triangles)
+
+    assert numpy.all(welded[:, 0] != welded[:, 1])
+    assert numpy.all(welded[:, 1] != welded[:, 2])
+    assert numpy.all(welded[:, 2] != welded[:, 0])
+
+    edges = numpy.sort(welded[:, [0, 1, 1, 2, 2, 0]].reshape(-1, 2), axis=1)
+    _, counts = numpy.unique(edges, axis=0, return_counts=True)
+
+    assert numpy.all(counts == 2)
+
+    faces = numpy.unique(numpy.sort(welded, axis=1), axis=0)
+
+    assert len(faces) == len(welded)
+
+
+@pytest.mark.parametrize('flat', [False, True])
+def test_torus_reaches_target(flat):
+    positions, _, triangles = torus(flat=flat)
+    target = len(triangles) // 4
+
+    result, moved = htaparser.simplify(positions, triangles.ravel(), target)
+
+    assert len(result) <= target
+    assert_closed_manifold(moved, result)
+
+
+@pytest.mark.parametrize('flat', [False, True])
+def test_torus_stays_on_surface(flat):
+    positions, _, triangles = torus(flat=flat)
+    result, moved = htaparser.simplify(positions, triangles.ravel(), len(triangles) // 4)
+
+    points = moved[numpy.unique(result)]
+    ring = numpy.hypot(points[:, 0], points[:, 2]) - 1.0
+
+    assert numpy.allclose(numpy.hypot(ring, points[:, 1]), 0.4)
+
+
+def test_seam_keeps_coordinates():
+    positions, coords, triangles = torus()
+    result, moved = htaparser.simplify(positions, triangles.ravel(), len(triangles) // 4)
+
+    spans = numpy.ptp(coords[result], axis=1)
+
+    assert numpy.all(spans < 0.5)
+    assert numpy.allclose(moved[numpy.unique(result)], positions[numpy.unique(result)])
+
+
+def test_flat_wedges_follow_collapse():
+    positions, _, triangles = torus(flat=True)
+    result, moved = htaparser.simplify(positions, triangles.ravel(), len(triangles) // 2)
+
+    assert len(numpy.unique(result)) == len(result) * 3
+
+
+def test_open_border_is_kept():
+    positions, _, triangles = torus()
+    triangles = triangles[:len(triangles) // 2]
+    result, moved = htaparser.simplify(positions, triangles.ravel(), len(triangles) // 4)
+
+    welded = weld(moved, result)
+    edges = numpy.sort(welded[:, [0, 1, 1, 2, 2, 0]].reshape(-1, 2), axis=1)
+    _, counts = numpy.unique(edges, axis=0, return_counts=True)
+
+    assert numpy.all(counts <= 2)
+    assert numpy.abs(moved[numpy.unique(result)][:, 2]).min() < 1e-9